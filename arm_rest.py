@@ -0,0 +1,450 @@
+"""
+ARM REST Backend
+Serve collector list commands straight from the Azure Resource Manager REST
+API, reusing one Azure CLI access token and keep-alive HTTPS connections.
+"""
+
+import http.client
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Optional
+from urllib.parse import urlsplit
+
+from collectors import (
+    MAX_AZ_ATTEMPTS,
+    RETRY_INITIAL_DELAY,
+    RETRY_MAX_DELAY,
+    run_az_command,
+    run_az_dict,
+)
+from utils import dump_json, load_json, logger
+
+
+ARM_ENDPOINT = "https://management.azure.com"
+NETWORK_API_VERSION = "2023-09-01"
+PRIVATE_DNS_API_VERSION = "2020-06-01"
+TOKEN_REFRESH_MARGIN = 300  # Seconds before expiry to fetch a new token
+REQUEST_TIMEOUT = 60
+
+# Once ARM reports this few reads left in the subscription's window, space
+# requests out instead of running into 429s
+RATE_LIMIT_LOW_WATER = 50
+RATE_LIMIT_DELAY = 1.0
+
+# ARM batch endpoint; kept well under its sub-request limit per POST
+BATCH_API_VERSION = "2020-06-01"
+BATCH_SIZE = 20
+BATCH_POLL_INTERVAL = 1.0
+
+# az list command -> (ARM resource type, API version)
+LIST_COMMANDS = {
+    ("network", "vnet", "list"): ("Microsoft.Network/virtualNetworks", NETWORK_API_VERSION),
+    ("network", "nsg", "list"): ("Microsoft.Network/networkSecurityGroups", NETWORK_API_VERSION),
+    ("network", "firewall", "list"): ("Microsoft.Network/azureFirewalls", NETWORK_API_VERSION),
+    ("network", "firewall", "policy", "list"): ("Microsoft.Network/firewallPolicies", NETWORK_API_VERSION),
+    ("network", "route-table", "list"): ("Microsoft.Network/routeTables", NETWORK_API_VERSION),
+    ("network", "private-endpoint", "list"): ("Microsoft.Network/privateEndpoints", NETWORK_API_VERSION),
+    ("network", "public-ip", "list"): ("Microsoft.Network/publicIPAddresses", NETWORK_API_VERSION),
+    ("network", "private-dns", "zone", "list"): ("Microsoft.Network/privateDnsZones", PRIVATE_DNS_API_VERSION),
+    ("network", "application-gateway", "list"): ("Microsoft.Network/applicationGateways", NETWORK_API_VERSION),
+    ("network", "lb", "list"): ("Microsoft.Network/loadBalancers", NETWORK_API_VERSION),
+    ("network", "vnet-gateway", "list"): ("Microsoft.Network/virtualNetworkGateways", NETWORK_API_VERSION),
+    ("network", "bastion", "list"): ("Microsoft.Network/bastionHosts", NETWORK_API_VERSION),
+    ("network", "nic", "list"): ("Microsoft.Network/networkInterfaces", NETWORK_API_VERSION),
+}
+
+# az child list command -> (parent type, parent name option, child collection, API version)
+CHILD_LIST_COMMANDS = {
+    ("network", "firewall", "policy", "rule-collection-group", "list"):
+        ("Microsoft.Network/firewallPolicies", "--policy-name", "ruleCollectionGroups", NETWORK_API_VERSION),
+    ("network", "private-dns", "link", "vnet", "list"):
+        ("Microsoft.Network/privateDnsZones", "--zone-name", "virtualNetworkLinks", PRIVATE_DNS_API_VERSION),
+    ("network", "vnet", "peering", "list"):
+        ("Microsoft.Network/virtualNetworks", "--vnet-name", "virtualNetworkPeerings", NETWORK_API_VERSION),
+    ("network", "nsg", "rule", "list"):
+        ("Microsoft.Network/networkSecurityGroups", "--nsg-name", "securityRules", NETWORK_API_VERSION),
+}
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter before retry number `attempt`."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_INITIAL_DELAY * 2 ** (attempt - 1)))
+
+
+def split_az_command(command: list[str]) -> tuple[tuple[str, ...], dict[str, str]]:
+    """Split an az argv into its command words and --option values."""
+    words = []
+    options = {}
+    i = 0
+    while i < len(command):
+        arg = command[i]
+        if arg.startswith("--"):
+            options[arg] = command[i + 1] if i + 1 < len(command) else ""
+            i += 2
+        else:
+            words.append(arg)
+            i += 1
+    return tuple(words), options
+
+
+def default_subscription() -> Optional[str]:
+    """Get the Azure CLI's current subscription ID."""
+    account = run_az_dict(["account", "show"])
+    return account.get("id") if account else None
+
+
+def arm_path(command: list[str], subscription_id: Optional[str]) -> Optional[tuple[str, str]]:
+    """Map an az list argv to its ARM collection path and API version."""
+    words, options = split_az_command(command)
+    subscription = options.get("--subscription") or subscription_id
+    rg = options.get("--resource-group")
+    if not subscription:
+        return None
+
+    if words in LIST_COMMANDS:
+        resource_type, api_version = LIST_COMMANDS[words]
+        scope = f"/subscriptions/{subscription}"
+        if rg:
+            scope += f"/resourceGroups/{rg}"
+        return f"{scope}/providers/{resource_type}", api_version
+
+    if words in CHILD_LIST_COMMANDS and rg:
+        parent_type, name_option, collection, api_version = CHILD_LIST_COMMANDS[words]
+        parent = options.get(name_option)
+        if parent:
+            return (f"/subscriptions/{subscription}/resourceGroups/{rg}"
+                    f"/providers/{parent_type}/{parent}/{collection}"), api_version
+    return None
+
+
+def batch_body(urls: list[str]) -> bytes:
+    """Build an ARM batch request body GETting each path, named by its index."""
+    return dump_json({"requests": [
+        {"httpMethod": "GET", "url": f"{ARM_ENDPOINT}{url}", "name": str(i)}
+        for i, url in enumerate(urls)
+    ]})
+
+
+def batch_responses(reply: dict, count: int) -> list[Optional[dict]]:
+    """Order an ARM batch reply's sub-responses like the requests batch_body built."""
+    responses = {r.get("name"): r for r in reply.get("responses", [])}
+    return [responses.get(str(i)) for i in range(count)]
+
+
+def _resource_group_from_id(resource_id: str) -> Optional[str]:
+    """Get the resource group segment of an ARM resource ID."""
+    parts = resource_id.split("/")
+    for i, part in enumerate(parts[:-1]):
+        if part.lower() == "resourcegroups":
+            return parts[i + 1]
+    return None
+
+
+def to_cli_shape(value):
+    """
+    Convert an ARM REST payload to the shape Azure CLI prints.
+
+    The CLI hoists each resource's "properties" to the top level and adds
+    resourceGroup to every object carrying a resource ID, including nested
+    sub-resources and references.
+    """
+    if isinstance(value, list):
+        return [to_cli_shape(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    result = {k: to_cli_shape(v) for k, v in value.items() if k != "properties"}
+    props = value.get("properties")
+    if isinstance(props, dict) and ("id" in value or "name" in value):
+        for k, v in props.items():
+            result.setdefault(k, to_cli_shape(v))
+    elif "properties" in value:
+        result["properties"] = to_cli_shape(props)
+
+    resource_id = result.get("id")
+    if isinstance(resource_id, str) and "resourceGroup" not in result:
+        rg = _resource_group_from_id(resource_id)
+        if rg:
+            result["resourceGroup"] = rg
+    return result
+
+
+class ArmRestClient:
+    """
+    Drop-in replacement for run_az_command backed by the ARM REST API.
+
+    One token from "az account get-access-token" is reused until shortly
+    before it expires, and keep-alive connections are pooled across all
+    worker threads, so a collection run pays for a single CLI start-up and
+    a handful of TLS handshakes instead of one of each per call. Commands
+    without a REST mapping are passed through to az.
+    """
+
+    def __init__(self, subscription_id: Optional[str] = None) -> None:
+        self.subscription_id = subscription_id
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_lock = threading.Lock()
+        self._reads_remaining: Optional[int] = None
+        self._idle: list[http.client.HTTPConnection] = []
+        self._pool_lock = threading.Lock()
+        endpoint = urlsplit(ARM_ENDPOINT)
+        self._scheme = endpoint.scheme
+        self._host = endpoint.netloc
+
+    def _get_token(self) -> Optional[str]:
+        """Get a cached ARM access token, refreshing it near expiry."""
+        with self._token_lock:
+            if self._token and time.time() < self._token_expires - TOKEN_REFRESH_MARGIN:
+                return self._token
+
+            token = run_az_dict(["account", "get-access-token", "--resource", ARM_ENDPOINT])
+            if not token or not token.get("accessToken"):
+                logger.warning("Could not get an Azure access token from Azure CLI")
+                return None
+
+            self._token = token["accessToken"]
+            self._token_expires = float(token.get("expires_on") or time.time() + 3600)
+            if not self.subscription_id:
+                self.subscription_id = token.get("subscription") or default_subscription()
+            return self._token
+
+    def _invalidate_token(self, token: str) -> None:
+        """Drop a token ARM rejected, unless another thread already replaced it."""
+        with self._token_lock:
+            if self._token == token:
+                self._token = None
+
+    def _acquire_connection(self) -> http.client.HTTPConnection:
+        """
+        Take an idle keep-alive connection to ARM, or open a new one.
+
+        The pool outlives the short-lived per-resource-group worker threads,
+        so their connections are reused rather than renegotiated.
+        """
+        with self._pool_lock:
+            if self._idle:
+                return self._idle.pop()
+        conn_class = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+        return conn_class(self._host, timeout=REQUEST_TIMEOUT)
+
+    def _release_connection(self, conn: http.client.HTTPConnection) -> None:
+        """Return a connection to the idle pool once its response is fully read."""
+        with self._pool_lock:
+            self._idle.append(conn)
+
+    def _request(self, method: str, url: str, body: Optional[bytes] = None) -> Optional[tuple[int, Optional[str], bytes]]:
+        """
+        Send an ARM request, retrying on throttling and dropped connections.
+
+        Returns (status, Location header, body) of the final response, or
+        None if no response could be obtained.
+        """
+        parts = urlsplit(url)
+        path = f"{parts.path}?{parts.query}" if parts.netloc else url
+        headers = {"Accept": "application/json"}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(1, MAX_AZ_ATTEMPTS + 1):
+            token = self._get_token()
+            if token is None:
+                return None
+            headers["Authorization"] = f"Bearer {token}"
+
+            remaining = self._reads_remaining
+            if remaining is not None and remaining < RATE_LIMIT_LOW_WATER:
+                time.sleep(RATE_LIMIT_DELAY)
+
+            conn = self._acquire_connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                # A closed connection reconnects on its next request
+                conn.close()
+                if attempt == MAX_AZ_ATTEMPTS:
+                    logger.warning(f"Request failed - {method} {path}: {e}")
+                    return None
+                delay = _backoff_delay(attempt)
+                logger.warning(f"Request failed, retrying in {delay:.1f}s - {method} {parts.path}: {e}")
+                time.sleep(delay)
+                continue
+            finally:
+                self._release_connection(conn)
+
+            remaining = response.getheader("x-ms-ratelimit-remaining-subscription-reads")
+            if remaining and remaining.isdigit():
+                self._reads_remaining = int(remaining)
+
+            if response.status == 401 and attempt < MAX_AZ_ATTEMPTS:
+                # Token revoked or expired early; fetch a fresh one
+                self._invalidate_token(token)
+                continue
+            if response.status != 429 or attempt == MAX_AZ_ATTEMPTS:
+                return response.status, response.getheader("Location"), payload
+
+            # Honour Retry-After, otherwise exponential backoff with full jitter
+            retry_after = response.getheader("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = min(RETRY_MAX_DELAY, float(retry_after))
+            else:
+                delay = _backoff_delay(attempt)
+            logger.warning(f"Throttled by Azure, retrying in {delay:.1f}s - {method} {parts.path}")
+            time.sleep(delay)
+        return None
+
+    def _get(self, url: str) -> Optional[dict]:
+        """GET an ARM URL or path and parse the JSON response."""
+        result = self._request("GET", url)
+        if result is None:
+            return None
+        status, _, payload = result
+        if status == 200:
+            return load_json(payload)
+        logger.warning(f"Request failed - GET {urlsplit(url).path}: HTTP {status}")
+        return None
+
+    def _follow_pages(self, url: Optional[str], items: list) -> Optional[list]:
+        """Append the items of a collection page and all its nextLink pages."""
+        while url:
+            page = self._get(url)
+            if page is None:
+                return None
+            items.extend(page.get("value", []))
+            url = page.get("nextLink")
+        return items
+
+    def _list(self, path: str, api_version: str) -> Optional[list]:
+        """List a collection, following nextLink pages."""
+        items = self._follow_pages(f"{path}?api-version={api_version}", [])
+        return to_cli_shape(items) if items is not None else None
+
+    def _batch(self, urls: list[str]) -> Optional[list[Optional[dict]]]:
+        """
+        GET several ARM paths in one POST to the batch endpoint.
+
+        Returns each sub-response ({"httpStatusCode", "content", ...}) in input
+        order, or None if the batch itself failed. Long-running batches
+        answer 202 and are polled at their Location until they complete.
+        """
+        result = self._request("POST", f"/batch?api-version={BATCH_API_VERSION}", batch_body(urls))
+        while result is not None and result[0] == 202 and result[1]:
+            time.sleep(BATCH_POLL_INTERVAL)
+            result = self._request("GET", result[1])
+        if result is None or result[0] != 200:
+            if result is not None:
+                logger.warning(f"Batch request failed: HTTP {result[0]}")
+            return None
+
+        return batch_responses(load_json(result[2]), len(urls))
+
+    def run(self, command: list[str]) -> Optional[list | dict]:
+        """Run a collector command, same contract as run_az_command."""
+        if not self.subscription_id and "--subscription" not in command:
+            self._get_token()  # Also learns the default subscription
+
+        target = arm_path(command, self.subscription_id)
+        if target is None:
+            return run_az_command(command)
+        return self._list(*target)
+
+    def run_many(self, commands: list[list[str]]) -> list[Optional[list | dict]]:
+        """
+        Run several collector commands, results in input order.
+
+        Mapped list commands are sent BATCH_SIZE at a time through the ARM
+        batch endpoint, so e.g. every policy's rule collection groups cost one
+        round-trip instead of one each. Sub-requests that fail or are
+        throttled, and any whole batch that fails, are retried one by one.
+        """
+        if not self.subscription_id and any("--subscription" not in c for c in commands):
+            self._get_token()
+
+        targets = [arm_path(command, self.subscription_id) for command in commands]
+        results: list[Optional[list | dict]] = [None] * len(commands)
+        batched = [i for i, target in enumerate(targets) if target is not None]
+
+        for start in range(0, len(batched), BATCH_SIZE):
+            chunk = batched[start:start + BATCH_SIZE]
+            urls = [f"{targets[i][0]}?api-version={targets[i][1]}" for i in chunk]
+            responses = self._batch(urls) or [None] * len(chunk)
+            for i, response in zip(chunk, responses):
+                items = None
+                if response and response.get("httpStatusCode") == 200:
+                    content = response.get("content") or {}
+                    items = self._follow_pages(content.get("nextLink"), list(content.get("value", [])))
+                results[i] = to_cli_shape(items) if items is not None else self._list(*targets[i])
+
+        for i, target in enumerate(targets):
+            if target is None:
+                results[i] = run_az_command(commands[i])
+        return results
+
+
+class AzCliBatcher:
+    """
+    Run many list commands through one "az rest" call to the ARM batch endpoint.
+
+    For the Azure CLI backend: per-policy rule collection group and per-zone
+    DNS link lists share a single az process per BATCH_SIZE commands instead
+    of starting one each. Sub-requests that fail, are throttled or have more
+    pages, and commands without a REST mapping, are run through az one by one.
+    Batches and those fallback commands run concurrently on `executor` when
+    one is given.
+    """
+
+    def __init__(self, subscription_id: Optional[str] = None, executor: Optional[Executor] = None) -> None:
+        self.subscription_id = subscription_id
+        self._map = executor.map if executor is not None else map
+        self._lock = threading.Lock()
+
+    def _post(self, urls: list[str]) -> Optional[list[Optional[dict]]]:
+        """POST one batch through az rest, returning its ordered sub-responses."""
+        # Passed as a file: az reads "@path" bodies, and a long inline body
+        # could exceed the command-line length limit on Windows.
+        with tempfile.NamedTemporaryFile("wb", suffix=".json", delete=False) as body_file:
+            body_file.write(batch_body(urls))
+        try:
+            reply = run_az_dict(["rest", "--method", "post",
+                                 "--uri", f"{ARM_ENDPOINT}/batch?api-version={BATCH_API_VERSION}",
+                                 "--body", f"@{body_file.name}"])
+        finally:
+            os.unlink(body_file.name)
+        return batch_responses(reply, len(urls)) if reply is not None else None
+
+    def run_many(self, commands: list[list[str]]) -> list[Optional[list | dict]]:
+        """Run several collector commands, results in input order."""
+        if len(commands) < 2:
+            return list(self._map(run_az_command, commands))
+
+        if not self.subscription_id and any("--subscription" not in c for c in commands):
+            with self._lock:
+                if not self.subscription_id:
+                    self.subscription_id = default_subscription()
+
+        targets = [arm_path(command, self.subscription_id) for command in commands]
+        results: list[Optional[list | dict]] = [None] * len(commands)
+        pending = set(range(len(commands)))
+        batched = [i for i, target in enumerate(targets) if target is not None]
+
+        chunks = [batched[start:start + BATCH_SIZE] for start in range(0, len(batched), BATCH_SIZE)]
+        replies = self._map(self._post, [
+            [f"{targets[i][0]}?api-version={targets[i][1]}" for i in chunk] for chunk in chunks
+        ])
+        for chunk, responses in zip(chunks, replies):
+            for i, response in zip(chunk, responses or ()):
+                content = response.get("content") if response and response.get("httpStatusCode") == 200 else None
+                if isinstance(content, dict) and not content.get("nextLink"):
+                    results[i] = to_cli_shape(content.get("value", []))
+                    pending.discard(i)
+
+        pending = sorted(pending)
+        for i, result in zip(pending, self._map(run_az_command, [commands[i] for i in pending])):
+            results[i] = result
+        return results
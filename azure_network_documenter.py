@@ -5,19 +5,26 @@ Collects information about VNets, Subnets, Firewall Policies, NSGs, Route Tables
 Private Endpoints, and generates interactive network maps.
 """
 
+import hashlib
 import json
+import logging
+import shutil
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 from pathlib import Path
 from datetime import datetime
 
-from collectors import AzureCollector
-from utils import logger
-from graph_builder import NetworkGraphBuilder
-from visualizer import NetworkVisualizer
-from exporters import MarkdownExporter, JSONExporter
+import utils
+from utils import dump_json, flush_logs, load_json, load_msgpack, logger
+
+
+# Seconds to wait for `az account show` before giving up
+AZ_LOGIN_CHECK_TIMEOUT = 30
 
 
 @dataclass
@@ -32,138 +39,409 @@ class DocumenterConfig:
     include_private_endpoints: bool = True
     include_peerings: bool = True
     include_service_endpoints: bool = True
+    max_parallel: int = 8
+    cache_ttl: int = 0  # Seconds to reuse collected data from disk; 0 disables
+    offline: bool = False  # Never call Azure; document already loaded data
+    backend: str = "cli"  # "cli" runs az per call, "rest" calls ARM directly, "sdk" uses azure-mgmt-network
+    strip_raw: bool = False  # Drop raw arrays once their *_processed summary is built
+    az_batch: bool = False  # cli backend: send detail lists through one "az rest" ARM batch call
+
+
+@lru_cache(maxsize=1)
+def _az_account() -> tuple[Optional[str], Optional[str]]:
+    """
+    Run "az account show" once per process.
+
+    Returns (error, subscription_id): why Azure CLI is unusable or None if
+    it is ready, and the ID of the default subscription when it is.
+    """
+    az = shutil.which("az")
+    if az is None:
+        return "Azure CLI not found. Please install it first.", None
+
+    try:
+        # Only the exit code and the subscription ID are needed
+        result = subprocess.run(
+            [az, "account", "show", "--query", "id", "--output", "tsv"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=AZ_LOGIN_CHECK_TIMEOUT
+        )
+        if result.returncode != 0:
+            return "Not logged into Azure CLI. Run 'az login' first.", None
+        return None, result.stdout.decode(errors="replace").strip() or None
+    except FileNotFoundError:
+        return "Azure CLI not found. Please install it first.", None
+    except subprocess.TimeoutExpired:
+        return f"Azure CLI did not respond within {AZ_LOGIN_CHECK_TIMEOUT}s.", None
+
+
+def _azure_cli_error() -> Optional[str]:
+    """Return why Azure CLI is unusable, or None if it is ready (cached per process)."""
+    return _az_account()[0]
+
+
+def _load_sidecar(path: Path):
+    """
+    Return the data in an up-to-date .msgpack sidecar of `path`, or None.
+
+    The sidecar is only a faster copy of the JSON file the user named, so
+    one that is missing, stale or cannot be decoded here is skipped.
+    """
+    if utils.msgpack is None:
+        return None
+    sidecar = path.with_suffix(".msgpack")
+    try:
+        if sidecar.stat().st_mtime < path.stat().st_mtime:
+            return None
+        return load_msgpack(sidecar.read_bytes())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable sidecar {sidecar}: {e}")
+        return None
+
+
+def load_network_data(path: str) -> dict:
+    """
+    Load previously collected network data from disk.
+
+    Accepts raw collected data, the JSONExporter output (which wraps it in
+    "network_data"), or its .msgpack sidecar. For a JSON file with an
+    up-to-date, readable sidecar next to it, the faster binary sidecar is read.
+    """
+    path = Path(path)
+
+    if path.suffix == ".msgpack":
+        if utils.msgpack is None:
+            raise ValueError("the msgpack package is required to read .msgpack files")
+        data = load_msgpack(path.read_bytes())
+    else:
+        data = _load_sidecar(path)
+        if data is None:
+            data = load_json(path.read_bytes())
+
+    if isinstance(data, dict) and "network_data" in data and "vnets" not in data:
+        data = data["network_data"]
+    return data
 
 
 class AzureNetworkDocumenter:
     """Main class for documenting Azure network infrastructure."""
 
     def __init__(self, config: DocumenterConfig):
+        # Pipeline modules are imported on first use so that `--help` and
+        # `--from-json` runs don't pay for modules they never touch.
+        from graph_builder import NetworkGraphBuilder
+        from visualizer import NetworkVisualizer
+
         self.config = config
-        self.collector = AzureCollector(config)
+        self._output_dir = Path(config.output_dir)
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        self._output_paths = {
+            "html": str(self._output_dir / "network_map.html"),
+            "markdown": str(self._output_dir / "network_documentation.md"),
+            "json": str(self._output_dir / "network_data.json"),
+        }
+        self._collector = None
         self.graph_builder = NetworkGraphBuilder()
         self.visualizer = NetworkVisualizer()
         self.network_data = {}
+        # Graph/connectivity snapshots, valid for one (network_data, build) pair
+        self._build_epoch = 0
+        self._snapshot_key: Optional[tuple] = None
+        self._snapshot: dict = {}
+
+    @property
+    def collector(self):
+        """Azure data collector, created on first access."""
+        if self._collector is None:
+            from collectors import AzureCollector
+            self._collector = AzureCollector(self.config)
+        return self._collector
 
     def check_azure_cli(self) -> bool:
         """Check if Azure CLI is installed and logged in."""
-        try:
-            result = subprocess.run(
-                ["az", "account", "show"],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode != 0:
-                logger.error("Not logged into Azure CLI. Run 'az login' first.")
-                return False
-            return True
-        except FileNotFoundError:
-            logger.error("Azure CLI not found. Please install it first.")
+        error = _azure_cli_error()
+        if error:
+            logger.error(error)
             return False
+        return True
+
+    def _cache_path(self) -> Optional[Path]:
+        """
+        Get the on-disk cache file for the current collection scope.
+
+        Without --subscription the scope is az's current default subscription,
+        so a later "az account set" selects a different entry. Returns None
+        when that subscription can't be determined.
+        """
+        config = self.config
+        subscription_id = config.subscription_id or _az_account()[1]
+        if subscription_id is None:
+            return None
+        scope = {
+            "subscription_id": subscription_id.lower(),
+            "resource_groups": sorted(rg.lower() for rg in config.resource_groups),
+            "flags": [
+                config.include_firewall_rules,
+                config.include_nsg_rules,
+                config.include_route_tables,
+                config.include_private_endpoints,
+                config.include_peerings,
+                config.include_service_endpoints,
+            ],
+            # Stripped data lacks the raw arrays a normal run documents
+            "strip_raw": config.strip_raw,
+        }
+        key = hashlib.blake2b(dump_json(scope), digest_size=16).hexdigest()
+        return self._output_dir / ".cache" / f"{key}.json"
+
+    def _load_cached_data(self) -> Optional[dict]:
+        """Load previously collected data if caching is enabled and it is fresh."""
+        if self.config.cache_ttl <= 0:
+            return None
+
+        path = self._cache_path()
+        if path is None:
+            return None
+        try:
+            if time.time() - path.stat().st_mtime > self.config.cache_ttl:
+                return None
+            return load_json(path.read_bytes())
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Ignoring unreadable cache {path}: {e}")
+            return None
+
+    def _save_cached_data(self) -> None:
+        """Persist collected data for reuse by later runs."""
+        path = self._cache_path()
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(dump_json(self.network_data))
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write cache {path}: {e}")
+
+    def _timed_collect(self, collect_fn) -> tuple[list, float]:
+        """Run one collector over the configured scope and time it."""
+        start = time.perf_counter()
+        items = collect_fn()
+        return items, time.perf_counter() - start
 
     def collect_data(self) -> dict:
         """Collect all network-related data from Azure."""
+        if self.config.offline:
+            return self.network_data
+
         logger.info("=" * 60)
         logger.info("AZURE NETWORK DOCUMENTER")
         logger.info("=" * 60)
 
+        cached = self._load_cached_data()
+        if cached is not None:
+            logger.info(f"Using cached network data from {self._cache_path()}")
+            self.network_data = cached
+            return self.network_data
+
         if not self.check_azure_cli():
             return {}
 
         logger.info("Collecting Azure network data...")
 
-        # Collect all network resources
+        config = self.config
+        # The collector is good for one run: the with block below closes it,
+        # so hand it over and let a later run create a fresh one.
+        collector, self._collector = self.collector, None
+
+        # Collectors are independent and I/O-bound, so run them concurrently.
+        # Disabled categories map to None and are left as empty lists.
+        jobs = {
+            "vnets": collector.collect_vnets,
+            "subnets": collector.collect_subnets,
+            "nsgs": collector.collect_nsgs if config.include_nsg_rules else None,
+            "firewalls": collector.collect_firewalls,
+            "firewall_policies": collector.collect_firewall_policies if config.include_firewall_rules else None,
+            "route_tables": collector.collect_route_tables if config.include_route_tables else None,
+            "private_endpoints": collector.collect_private_endpoints if config.include_private_endpoints else None,
+            "peerings": collector.collect_peerings if config.include_peerings else None,
+            "public_ips": collector.collect_public_ips,
+            "private_dns_zones": collector.collect_private_dns_zones,
+            "application_gateways": collector.collect_app_gateways,
+            "load_balancers": collector.collect_load_balancers,
+            "virtual_network_gateways": collector.collect_vnet_gateways,
+            "bastion_hosts": collector.collect_bastion_hosts,
+            "nics": collector.collect_network_interfaces,
+        }
+
+        # Seed every category up front, in table order, so the dict is sized
+        # once rather than grown as results come in.
         self.network_data = {
             "metadata": {
-                "collected_at": datetime.now().isoformat(),
-                "subscription_id": self.config.subscription_id,
-                "resource_groups": self.config.resource_groups
+                "collected_at": datetime.now(),
+                "subscription_id": config.subscription_id,
+                "resource_groups": config.resource_groups
             },
-            "vnets": self.collector.collect_vnets(),
-            "subnets": self.collector.collect_subnets(),
-            "nsgs": self.collector.collect_nsgs() if self.config.include_nsg_rules else [],
-            "firewalls": self.collector.collect_firewalls(),
-            "firewall_policies": self.collector.collect_firewall_policies() if self.config.include_firewall_rules else [],
-            "route_tables": self.collector.collect_route_tables() if self.config.include_route_tables else [],
-            "private_endpoints": self.collector.collect_private_endpoints() if self.config.include_private_endpoints else [],
-            "peerings": self.collector.collect_peerings() if self.config.include_peerings else [],
-            "public_ips": self.collector.collect_public_ips(),
-            "private_dns_zones": self.collector.collect_private_dns_zones(),
-            "application_gateways": self.collector.collect_app_gateways(),
-            "load_balancers": self.collector.collect_load_balancers(),
-            "virtual_network_gateways": self.collector.collect_vnet_gateways(),
-            "bastion_hosts": self.collector.collect_bastion_hosts(),
-            "nics": self.collector.collect_network_interfaces(),
+            **dict.fromkeys(jobs),
         }
 
+        errors = []
+        timings = {}
+        start = time.perf_counter()
+        with collector, ThreadPoolExecutor(max_workers=max(1, config.max_parallel)) as executor:
+            futures = {
+                key: executor.submit(self._timed_collect, fn)
+                for key, fn in jobs.items() if fn is not None
+            }
+
+            for key in jobs:
+                future = futures.get(key)
+                if future is None:
+                    self.network_data[key] = []
+                    continue
+                try:
+                    self.network_data[key], timings[key] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to collect {key}: {e}")
+                    errors.append({"collector": key, "error": str(e)})
+                    self.network_data[key] = []
+
+        # Per-collector wall time, slowest first, to show where time goes
+        for key, elapsed in sorted(timings.items(), key=lambda kv: kv[1], reverse=True):
+            logger.info(f"  {key}: {len(self.network_data[key])} items in {elapsed:.2f}s")
+        logger.info(f"Collection finished in {time.perf_counter() - start:.2f}s")
+
+        if errors:
+            self.network_data["metadata"]["errors"] = errors
+        elif config.cache_ttl > 0:
+            self._save_cached_data()
+
         return self.network_data
 
     def build_graph(self) -> dict:
         """Build a network graph from collected data."""
         logger.info("Building network graph...")
-        return self.graph_builder.build(self.network_data)
+        self._build_epoch += 1
+        graph_data = self.graph_builder.build(self.network_data)
+        self._snapshots()["graph"] = graph_data
+        return graph_data
 
     def analyze_connectivity(self) -> dict:
         """Analyze what can connect to what based on rules."""
         logger.info("Analyzing connectivity...")
-        return self.graph_builder.analyze_connectivity()
-
-    def generate_visualization(self, output_path: str = None) -> str:
+        connectivity = self.graph_builder.analyze_connectivity()
+        self._snapshots()["connectivity"] = connectivity
+        return connectivity
+
+    def _snapshots(self) -> dict:
+        """
+        Get the snapshot cache for the current network data and graph build.
+
+        The cache is keyed by the identity of network_data and a counter
+        bumped on every build_graph() call, so replacing the data or
+        rebuilding the graph drops any stale snapshots.
+        """
+        key = (id(self.network_data), self._build_epoch)
+        if self._snapshot_key != key:
+            self._snapshot_key = key
+            self._snapshot = {}
+        return self._snapshot
+
+    def _get_graph_data(self) -> dict:
+        """Get graph data, reusing the snapshot taken by build_graph()."""
+        snapshots = self._snapshots()
+        if "graph" not in snapshots:
+            snapshots["graph"] = self.graph_builder.get_graph_data()
+        return snapshots["graph"]
+
+    def _get_connectivity(self) -> dict:
+        """Get connectivity results, reusing the snapshot from analyze_connectivity()."""
+        snapshots = self._snapshots()
+        if "connectivity" not in snapshots:
+            snapshots["connectivity"] = self.graph_builder.get_connectivity_matrix()
+        return snapshots["connectivity"]
+
+    def generate_visualization(self, output_path: str = None, graph_data: dict = None,
+                               connectivity: dict = None) -> str:
         """Generate interactive HTML visualization."""
         logger.info("Generating visualization...")
         if output_path is None:
-            output_path = Path(self.config.output_dir) / "network_map.html"
-
-        graph = self.graph_builder.get_graph_data()
-        connectivity = self.graph_builder.get_connectivity_matrix()
+            output_path = self._output_paths["html"]
 
         return self.visualizer.generate_html(
-            graph,
-            connectivity,
+            graph_data if graph_data is not None else self._get_graph_data(),
+            connectivity if connectivity is not None else self._get_connectivity(),
             str(output_path)
         )
 
-    def export_markdown(self, output_path: str = None) -> str:
+    def export_markdown(self, output_path: str = None, connectivity: dict = None) -> str:
         """Export documentation as Markdown."""
         if output_path is None:
-            output_path = Path(self.config.output_dir) / "network_documentation.md"
+            output_path = self._output_paths["markdown"]
+
+        from exporters import MarkdownExporter
 
         exporter = MarkdownExporter()
         return exporter.export(
             self.network_data,
-            self.graph_builder.get_connectivity_matrix(),
+            connectivity if connectivity is not None else self._get_connectivity(),
             str(output_path)
         )
 
-    def export_json(self, output_path: str = None) -> str:
+    def export_json(self, output_path: str = None, graph_data: dict = None) -> str:
         """Export all data as JSON."""
         if output_path is None:
-            output_path = Path(self.config.output_dir) / "network_data.json"
+            output_path = self._output_paths["json"]
+
+        from exporters import JSONExporter
 
         exporter = JSONExporter()
         return exporter.export(
             self.network_data,
-            self.graph_builder.get_graph_data(),
+            graph_data if graph_data is not None else self._get_graph_data(),
             str(output_path)
         )
 
-    def run(self) -> dict:
-        """Run the full documentation process."""
-        # Create output directory
-        Path(self.config.output_dir).mkdir(parents=True, exist_ok=True)
-
+    def generate_outputs(self) -> tuple[str, str, str]:
+        """Generate the HTML map, Markdown docs and JSON export concurrently."""
+        # Snapshot shared inputs first; the generators only read them.
+        graph_data = self._get_graph_data()
+        connectivity = self._get_connectivity()
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            html_future = executor.submit(self.generate_visualization, None, graph_data, connectivity)
+            md_future = executor.submit(self.export_markdown, None, connectivity)
+            json_future = executor.submit(self.export_json, None, graph_data)
+            return html_future.result(), md_future.result(), json_future.result()
+
+    def run(self, network_data: Optional[dict] = None) -> dict:
+        """
+        Run the full documentation process.
+
+        Args:
+            network_data: Previously collected data to document instead of
+                collecting from Azure (e.g. loaded with --from-json)
+        """
         # Collect data
-        data = self.collect_data()
-        if not data:
-            return {}
+        if network_data is None:
+            data = self.collect_data()
+            flush_logs()
+            if not data:
+                return {}
+        else:
+            data = self.network_data = network_data
 
         # Build graph and analyze
         self.build_graph()
         connectivity = self.analyze_connectivity()
+        flush_logs()
 
         # Generate outputs
-        html_path = self.generate_visualization()
-        md_path = self.export_markdown()
-        json_path = self.export_json()
+        html_path, md_path, json_path = self.generate_outputs()
 
         logger.info("=" * 60)
         logger.info("DOCUMENTATION COMPLETE")
@@ -172,6 +450,7 @@ class AzureNetworkDocumenter:
         logger.info(f"  - Interactive Map: {html_path}")
         logger.info(f"  - Markdown Docs:   {md_path}")
         logger.info(f"  - JSON Data:       {json_path}")
+        flush_logs()
 
         return {
             "data": data,
@@ -215,19 +494,65 @@ def main():
         action="store_true",
         help="Skip NSG rule collection"
     )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=8,
+        help="Maximum number of concurrent collector calls (default: 8)"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=0,
+        help="Reuse data collected within this many seconds (default: 0, disabled)"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["cli", "rest", "sdk"],
+        default="cli",
+        help="How to query Azure: run az per call (cli), call the ARM REST "
+             "API with one cached az token (rest), or use the Azure SDK "
+             "in-process (sdk) (default: cli)"
+    )
+    parser.add_argument(
+        "--az-batch",
+        action="store_true",
+        help="With --backend cli, fetch per-policy rule collection groups and "
+             "DNS zone links through ARM batch calls instead of one az each"
+    )
+    parser.add_argument(
+        "--strip-raw",
+        action="store_true",
+        help="Drop raw NSG default rules, firewall IP configurations and routes "
+             "once summarized, to reduce memory and output size"
+    )
     parser.add_argument(
         "--from-json",
-        help="Load data from existing JSON file instead of Azure"
+        help="Load data from an existing JSON (or .msgpack) file instead of Azure"
+    )
+    parser.add_argument(
+        "--quiet", "-q",
+        action="store_true",
+        help="Only log warnings and errors, not per-collector progress"
     )
 
     args = parser.parse_args()
 
+    if args.quiet:
+        logger.setLevel(logging.WARNING)
+
     config = DocumenterConfig(
         subscription_id=args.subscription,
         resource_groups=args.resource_groups or [],
         output_dir=args.output,
         include_firewall_rules=not args.no_firewall_rules,
-        include_nsg_rules=not args.no_nsg_rules
+        include_nsg_rules=not args.no_nsg_rules,
+        max_parallel=args.max_parallel,
+        cache_ttl=args.cache_ttl,
+        backend=args.backend,
+        strip_raw=args.strip_raw,
+        az_batch=args.az_batch,
+        offline=bool(args.from_json)
     )
 
     documenter = AzureNetworkDocumenter(config)
@@ -236,28 +561,25 @@ def main():
         # Load from existing JSON
         logger.info(f"Loading data from {args.from_json}...")
         try:
-            with open(args.from_json, 'r') as f:
-                documenter.network_data = json.load(f)
+            network_data = load_network_data(args.from_json)
         except FileNotFoundError:
             logger.error(f"File not found: {args.from_json}")
             sys.exit(1)
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in {args.from_json}: {e}")
             sys.exit(1)
+        except ValueError as e:
+            logger.error(f"Cannot read {args.from_json}: {e}")
+            sys.exit(1)
         except PermissionError:
             logger.error(f"Permission denied reading {args.from_json}")
             sys.exit(1)
 
-        # Create output directory
-        Path(args.output).mkdir(parents=True, exist_ok=True)
-
-        documenter.build_graph()
-        documenter.analyze_connectivity()
-        documenter.generate_visualization()
-        documenter.export_markdown()
-        documenter.export_json()
+        documenter.run(network_data)
     else:
-        # Run full collection
+        # Run full collection, with one az process limit for all collectors
+        from collectors import set_az_concurrency
+        set_az_concurrency(args.max_parallel)
         documenter.run()
 
 
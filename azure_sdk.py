@@ -0,0 +1,132 @@
+"""
+Azure SDK Backend
+Serve collector list commands in-process through the Azure management SDKs
+instead of spawning Azure CLI.
+"""
+
+import threading
+from typing import Optional
+
+from arm_rest import default_subscription, split_az_command, to_cli_shape
+from collectors import run_az_command
+from utils import logger
+
+from azure.core.exceptions import AzureError
+from azure.identity import DefaultAzureCredential
+from azure.mgmt.network import NetworkManagementClient
+
+try:
+    from azure.mgmt.privatedns import PrivateDnsManagementClient
+except ImportError:  # Optional - private DNS commands fall back to az
+    PrivateDnsManagementClient = None
+
+
+# az list command -> (operations group, subscription-wide list, per-RG list)
+NETWORK_LISTS = {
+    ("network", "vnet", "list"): ("virtual_networks", "list_all", "list"),
+    ("network", "nsg", "list"): ("network_security_groups", "list_all", "list"),
+    ("network", "firewall", "list"): ("azure_firewalls", "list_all", "list"),
+    ("network", "firewall", "policy", "list"): ("firewall_policies", "list_all", "list"),
+    ("network", "route-table", "list"): ("route_tables", "list_all", "list"),
+    ("network", "private-endpoint", "list"): ("private_endpoints", "list_by_subscription", "list"),
+    ("network", "public-ip", "list"): ("public_ip_addresses", "list_all", "list"),
+    ("network", "application-gateway", "list"): ("application_gateways", "list_all", "list"),
+    ("network", "lb", "list"): ("load_balancers", "list_all", "list"),
+    ("network", "vnet-gateway", "list"): ("virtual_network_gateways", None, "list"),
+    ("network", "bastion", "list"): ("bastion_hosts", "list", "list_by_resource_group"),
+    ("network", "nic", "list"): ("network_interfaces", "list_all", "list"),
+}
+
+# az child list command -> (operations group, parent name option)
+NETWORK_CHILD_LISTS = {
+    ("network", "firewall", "policy", "rule-collection-group", "list"):
+        ("firewall_policy_rule_collection_groups", "--policy-name"),
+    ("network", "vnet", "peering", "list"): ("virtual_network_peerings", "--vnet-name"),
+    ("network", "nsg", "rule", "list"): ("security_rules", "--nsg-name"),
+}
+
+PRIVATE_DNS_LISTS = {
+    ("network", "private-dns", "zone", "list"): ("private_zones", "list", "list_by_resource_group"),
+}
+
+PRIVATE_DNS_CHILD_LISTS = {
+    ("network", "private-dns", "link", "vnet", "list"): ("virtual_network_links", "--zone-name"),
+}
+
+
+class AzureSdkClient:
+    """
+    Drop-in replacement for run_az_command backed by the Azure SDKs.
+
+    SDK models are serialized straight to their REST form and flattened
+    like Azure CLI output, so no subprocess is started and no JSON text is
+    produced or parsed. Commands without an SDK mapping go through az.
+    """
+
+    def __init__(self, subscription_id: Optional[str] = None) -> None:
+        self.subscription_id = subscription_id
+        self._credential = DefaultAzureCredential()
+        self._clients: dict[tuple[str, str], object] = {}
+        self._lock = threading.Lock()
+
+    def _client(self, kind: str, subscription: str):
+        """Get a cached management client for a subscription."""
+        with self._lock:
+            client = self._clients.get((kind, subscription))
+            if client is None:
+                client_class = NetworkManagementClient if kind == "network" else PrivateDnsManagementClient
+                client = client_class(self._credential, subscription)
+                self._clients[(kind, subscription)] = client
+            return client
+
+    def _operation(self, command: list[str]):
+        """Map an az argv to a zero-argument callable returning SDK models."""
+        words, options = split_az_command(command)
+        rg = options.get("--resource-group")
+
+        if words in NETWORK_LISTS or words in NETWORK_CHILD_LISTS:
+            kind = "network"
+        elif (words in PRIVATE_DNS_LISTS or words in PRIVATE_DNS_CHILD_LISTS) and PrivateDnsManagementClient:
+            kind = "privatedns"
+        else:
+            return None
+
+        if not self.subscription_id and "--subscription" not in options:
+            with self._lock:
+                if not self.subscription_id:
+                    self.subscription_id = default_subscription()
+        subscription = options.get("--subscription") or self.subscription_id
+        if not subscription:
+            return None
+        client = self._client(kind, subscription)
+
+        lists = NETWORK_LISTS if kind == "network" else PRIVATE_DNS_LISTS
+        if words in lists:
+            group, list_all, list_rg = lists[words]
+            operations = getattr(client, group)
+            if rg:
+                return lambda: getattr(operations, list_rg)(rg)
+            if list_all is None:
+                return None  # Not listable subscription-wide; leave it to az
+            return getattr(operations, list_all)
+
+        child_lists = NETWORK_CHILD_LISTS if kind == "network" else PRIVATE_DNS_CHILD_LISTS
+        group, name_option = child_lists[words]
+        parent = options.get(name_option)
+        if not rg or not parent:
+            return None
+        return lambda: getattr(client, group).list(rg, parent)
+
+    def run(self, command: list[str]) -> Optional[list | dict]:
+        """Run a collector command, same contract as run_az_command."""
+        operation = self._operation(command)
+        if operation is None:
+            return run_az_command(command)
+
+        try:
+            # Convert each model as its page arrives, so the REST-form dicts
+            # are dropped one at a time rather than held as a second list.
+            return [to_cli_shape(item.serialize(keep_readonly=True)) for item in operation()]
+        except AzureError as e:
+            logger.warning(f"Command failed - {' '.join(command)}: {e}")
+            return None
@@ -3,317 +3,623 @@ Azure Data Collectors
 Modules to collect network-related resources from Azure using Azure CLI.
 """
 
-import json
+import random
+import re
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import wraps
+from itertools import chain
 from typing import Optional
 
-from utils import logger
+from utils import load_json, logger
 
+try:
+    import simdjson
+except ImportError:  # Optional dependency - responses are parsed in full
+    simdjson = None
 
-def run_az_command(command: list[str]) -> Optional[list | dict]:
-    """Run an Azure CLI command and return parsed JSON output."""
+try:
+    import ijson
+except ImportError:  # Optional dependency - large lists are read in one buffer
+    ijson = None
+
+
+# Retry policy for throttled (HTTP 429) Azure Resource Manager requests
+MAX_AZ_ATTEMPTS = 5
+RETRY_INITIAL_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+# "429" only as a whole token: GUIDs in other errors often contain it
+THROTTLE_PATTERN = re.compile(r"\b429\b|toomanyrequests|too many requests|throttl", re.IGNORECASE)
+
+# Concurrent per-resource-group list calls, kept low for ARM read throttling
+MAX_RG_WORKERS = 4
+
+# Server-side JMESPath projection of rule collection groups down to the
+# fields _rule_collection_group_record documents. Rules are the bulk of a
+# policy's output, and most of each rule is never read.
+RULE_COLLECTION_GROUP_QUERY = (
+    "[].{name: name, priority: priority, ruleCollections: ruleCollections[].{"
+    "name: name, priority: priority, ruleCollectionType: ruleCollectionType, action: action, "
+    "rules: rules[].{name: name, ruleType: ruleType, "
+    "sourceAddresses: sourceAddresses, sourceIpGroups: sourceIpGroups, "
+    "destinationAddresses: destinationAddresses, destinationIpGroups: destinationIpGroups, "
+    "destinationFqdns: destinationFqdns, destinationPorts: destinationPorts, "
+    "protocols: protocols, targetFqdns: targetFqdns, targetUrls: targetUrls, "
+    "ipProtocols: ipProtocols, translatedAddress: translatedAddress, "
+    "translatedPort: translatedPort}}}"
+)
+
+# Resolved once so each call skips the PATH search; on Windows this also
+# finds az.cmd, which a bare "az" argv does not without a shell.
+AZ_EXECUTABLE = shutil.which("az") or "az"
+
+
+def _is_throttled(stderr: str) -> bool:
+    """Check whether a failed Azure CLI call was rejected by ARM throttling."""
+    return THROTTLE_PATTERN.search(stderr) is not None
+
+
+_parsers = threading.local()
+
+# Caps az processes running at once across all collector and resource-group
+# threads; set once per process by the entry point (see set_az_concurrency).
+_az_slots = threading.BoundedSemaphore(8)
+
+
+def set_az_concurrency(limit: int) -> None:
+    """Set how many Azure CLI processes may run at the same time."""
+    global _az_slots
+    _az_slots = threading.BoundedSemaphore(max(1, limit))
+
+# Stand-in for a missing or null reference object; never mutated
+_EMPTY: dict = {}
+
+
+def _intern_id(resource_id: Optional[str]) -> Optional[str]:
+    """
+    Intern a resource ID that is referenced from many resources.
+
+    The same NSG, route table or VNet ID is decoded into a separate string
+    for every resource pointing at it; interning collapses them to one
+    object, which also makes later dict lookups by ID cheaper.
+    """
+    return sys.intern(resource_id) if isinstance(resource_id, str) else resource_id
+
+
+def _ref_id(obj, key: str) -> Optional[str]:
+    """Get the interned resource ID of an optional sub-resource reference."""
+    return _intern_id((obj.get(key) or _EMPTY).get("id"))
+
+
+def _read_all(stream) -> bytes:
+    """Read a command's whole stdout."""
+    return stream.read()
+
+
+def _read_items(stream) -> Optional[list]:
+    """
+    Parse a command's stdout as a JSON array one item at a time with ijson.
+
+    Items are decoded while az is still printing, so the raw output is never
+    held in memory next to its parsed form. Returns None if the output is
+    not a complete JSON array.
+    """
     try:
-        full_command = ["az"] + command + ["--output", "json"]
-        result = subprocess.run(
-            full_command,
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return json.loads(result.stdout)
+        return list(ijson.items(stream, "item", use_float=True))
+    except ijson.JSONError:
+        stream.read()  # Drain the pipe so az can exit
+        return None
+
+
+def _run_az_process(full_command: list[str], read_stdout=_read_all) -> tuple[int, object, str]:
+    """
+    Run az and return (returncode, read_stdout(stdout pipe), stderr text).
+
+    By default stdout is read straight off the pipe in one buffer rather than
+    through communicate(), which collects chunks and joins them into a second
+    copy of the payload. stderr goes to a temporary file so a chatty az cannot
+    fill its pipe and stall while stdout is being read.
+    """
+    with _az_slots, tempfile.TemporaryFile() as stderr_file:
+        with subprocess.Popen(full_command, stdout=subprocess.PIPE, stderr=stderr_file) as proc:
+            stdout = read_stdout(proc.stdout)
+            returncode = proc.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode("utf-8", errors="replace")
+    return returncode, stdout, stderr
+
+
+def _as_list(value) -> list:
+    """Materialize a JSON array that may be a lazy simdjson proxy."""
+    if value is None:
+        return []
+    return value.as_list() if hasattr(value, "as_list") else value
+
+
+def run_az_command(command: list[str], lazy: bool = False, stream: bool = False) -> Optional[list | dict]:
+    """
+    Run an Azure CLI command and return parsed JSON output.
+
+    With lazy=True and simdjson installed, the result is a lazy document
+    from this thread's reusable parser. Only the values read from it are
+    turned into Python objects, and it is only valid until the thread's
+    next lazy call.
+
+    With stream=True and ijson installed, a list command's output is parsed
+    item by item as it arrives instead of being buffered first.
+    """
+    try:
+        full_command = [AZ_EXECUTABLE, *command, "--output", "json"]
+        read_stdout = _read_items if stream and ijson is not None else _read_all
+        for attempt in range(1, MAX_AZ_ATTEMPTS + 1):
+            returncode, stdout, stderr = _run_az_process(full_command, read_stdout)
+            if returncode == 0 or attempt == MAX_AZ_ATTEMPTS or not _is_throttled(stderr):
+                break
+
+            # Exponential backoff with full jitter
+            delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_INITIAL_DELAY * 2 ** (attempt - 1)))
+            logger.warning(f"Throttled by Azure, retrying in {delay:.1f}s - {' '.join(command)}")
+            time.sleep(delay)
+
+        if read_stdout is _read_items:
+            return stdout if returncode == 0 else None
+
+        # isspace() checks for empty output without copying it like strip()
+        if returncode == 0 and stdout and not stdout.isspace():
+            if lazy and simdjson is not None:
+                parser = getattr(_parsers, "parser", None)
+                if parser is None:
+                    parser = _parsers.parser = simdjson.Parser()
+                return parser.parse(stdout)
+            return load_json(stdout)
         return None
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+    except (ValueError, FileNotFoundError) as e:
         logger.warning(f"Command failed - {' '.join(command)}: {e}")
         return None
 
 
+def run_az_dict(command: list[str]) -> Optional[dict]:
+    """Run an Azure CLI command that prints one object, e.g. "account show"."""
+    result = run_az_command(command)
+    return result if isinstance(result, dict) else None
+
+
+def _subnet_detail(subnet: dict) -> dict:
+    """Summarize a subnet embedded in a VNet for the VNet's subnets_detail."""
+    return {
+        "name": subnet.get("name"),
+        "id": subnet.get("id"),
+        "addressPrefix": subnet.get("addressPrefix"),
+        "addressPrefixes": subnet.get("addressPrefixes", []),
+        "nsg": _ref_id(subnet, "networkSecurityGroup"),
+        "routeTable": _ref_id(subnet, "routeTable"),
+        "serviceEndpoints": [se.get("service") for se in subnet.get("serviceEndpoints", [])],
+        "delegations": [d.get("serviceName") for d in subnet.get("delegations", [])],
+        "privateEndpointNetworkPolicies": subnet.get("privateEndpointNetworkPolicies"),
+        "natGateway": _ref_id(subnet, "natGateway"),
+    }
+
+
+def _subnet_record(subnet: dict, vnet_name: str, rg: str) -> dict:
+    """Build a top-level subnet record from a subnet embedded in a VNet."""
+    return {
+        "name": subnet.get("name"),
+        "id": subnet.get("id"),
+        "vnet": vnet_name,
+        "resourceGroup": rg,
+        "addressPrefix": subnet.get("addressPrefix"),
+        "addressPrefixes": subnet.get("addressPrefixes", []),
+        "nsg_id": _ref_id(subnet, "networkSecurityGroup"),
+        "routeTable_id": _ref_id(subnet, "routeTable"),
+        "serviceEndpoints": subnet.get("serviceEndpoints", []),
+        "delegations": subnet.get("delegations", []),
+        "ipConfigurations": subnet.get("ipConfigurations", []),
+        "privateEndpoints": subnet.get("privateEndpoints", []),
+    }
+
+
+def _default_rule_record(rule: dict) -> dict:
+    """Summarize one of an NSG's default security rules."""
+    return {
+        "name": rule.get("name"),
+        "priority": rule.get("priority"),
+        "direction": rule.get("direction"),
+        "access": rule.get("access"),
+        "protocol": rule.get("protocol"),
+        "sourceAddressPrefix": rule.get("sourceAddressPrefix"),
+        "sourcePortRange": rule.get("sourcePortRange"),
+        "destinationAddressPrefix": rule.get("destinationAddressPrefix"),
+        "destinationPortRange": rule.get("destinationPortRange"),
+    }
+
+
+def _firewall_ip_config_record(ip_config: dict) -> dict:
+    """Summarize an Azure Firewall IP configuration."""
+    return {
+        "name": ip_config.get("name"),
+        "privateIpAddress": ip_config.get("privateIpAddress"),
+        "publicIpAddress": _ref_id(ip_config, "publicIpAddress"),
+        "subnet": _ref_id(ip_config, "subnet"),
+    }
+
+
+def _endpoint_connection_record(conn: dict) -> dict:
+    """Summarize a private endpoint's (manual or automatic) service connection."""
+    return {
+        "name": conn.get("name"),
+        "privateLinkServiceId": _intern_id(conn.get("privateLinkServiceId")),
+        "groupIds": conn.get("groupIds", []),
+        "status": (conn.get("privateLinkServiceConnectionState") or _EMPTY).get("status"),
+    }
+
+
+def _policy_rule_record(rule) -> dict:
+    """Project the documented fields of a firewall policy rule."""
+    return {
+        "name": rule.get("name"),
+        "ruleType": rule.get("ruleType"),
+        "sourceAddresses": _as_list(rule.get("sourceAddresses")),
+        "sourceIpGroups": _as_list(rule.get("sourceIpGroups")),
+        "destinationAddresses": _as_list(rule.get("destinationAddresses")),
+        "destinationIpGroups": _as_list(rule.get("destinationIpGroups")),
+        "destinationFqdns": _as_list(rule.get("destinationFqdns")),
+        "destinationPorts": _as_list(rule.get("destinationPorts")),
+        "protocols": _as_list(rule.get("protocols")),
+        "targetFqdns": _as_list(rule.get("targetFqdns")),
+        "targetUrls": _as_list(rule.get("targetUrls")),
+        "ipProtocols": _as_list(rule.get("ipProtocols")),
+        "translatedAddress": rule.get("translatedAddress"),
+        "translatedPort": rule.get("translatedPort"),
+    }
+
+
+def _rule_collection_group_record(rcg) -> dict:
+    """Project a firewall policy rule collection group and its rule collections."""
+    return {
+        "name": rcg.get("name"),
+        "priority": rcg.get("priority"),
+        "ruleCollections": [
+            {
+                "name": rc.get("name"),
+                "priority": rc.get("priority"),
+                "ruleCollectionType": rc.get("ruleCollectionType"),
+                "action": (rc.get("action") or _EMPTY).get("type"),
+                "rules": [_policy_rule_record(rule) for rule in rc.get("rules") or ()],
+            }
+            for rc in rcg.get("ruleCollections") or ()
+        ],
+    }
+
+
+def _per_resource_group(collect_fn):
+    """
+    Scope a collector to the configured resource groups on the server side.
+
+    Called without a resource group while config.resource_groups is set, the
+    collector runs once per distinct group with --resource-group, so ARM only
+    returns matching resources, and the results are chained in order.
+    """
+    @wraps(collect_fn)
+    def wrapper(self, resource_group: Optional[str] = None) -> list:
+        resource_groups = self._resource_groups
+        if resource_group or not resource_groups:
+            return collect_fn(self, resource_group)
+
+        if len(resource_groups) == 1:
+            return collect_fn(self, resource_groups[0])
+
+        # A separate pool: the shared executor runs these collectors' detail calls
+        with ThreadPoolExecutor(max_workers=min(MAX_RG_WORKERS, len(resource_groups))) as executor:
+            results = executor.map(lambda rg: collect_fn(self, rg), resource_groups)
+            return list(chain.from_iterable(results))
+    return wrapper
+
+
 class AzureCollector:
     """Collector for Azure network resources."""
 
+    # Fixed attribute set: instance state lives in slots, not a __dict__
+    __slots__ = ("config", "_sub_args", "_resource_groups", "_rg_set", "_strip_raw", "_run_command",
+                 "_run_batch", "_executor", "_vnet_lists", "_vnet_lock")
+
     def __init__(self, config) -> None:
         self.config = config
+        # Spliced into every command instead of re-checking the subscription
+        self._sub_args: tuple[str, ...] = (
+            ("--subscription", config.subscription_id) if config.subscription_id else ()
+        )
+        # Resource group names are case-insensitive in Azure: keep the first
+        # spelling of each for --resource-group, and a lowercased set to filter by.
+        self._resource_groups: tuple[str, ...] = tuple(
+            {rg.lower(): rg for rg in config.resource_groups or ()}.values()
+        )
+        self._rg_set = frozenset(rg.lower() for rg in self._resource_groups)
+        self._strip_raw = getattr(config, "strip_raw", False)
+        # Shared by all collectors for per-resource detail calls; workers are
+        # only started on demand.
+        max_parallel = max(1, getattr(config, "max_parallel", 8))
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel)
+        self._run_command = run_az_command
+        # Optional backend hook running many commands in one round-trip
+        self._run_batch = None
+        backend = getattr(config, "backend", "cli")
+        if backend == "rest":
+            from arm_rest import ArmRestClient
+            client = ArmRestClient(config.subscription_id)
+            self._run_command = client.run
+            self._run_batch = client.run_many
+        elif backend == "sdk":
+            try:
+                from azure_sdk import AzureSdkClient
+                self._run_command = AzureSdkClient(config.subscription_id).run
+            except ImportError as e:
+                logger.warning(f"Azure SDK backend unavailable ({e}), using Azure CLI")
+        if self._run_command is run_az_command and getattr(config, "az_batch", False):
+            # Opt-in: detail lists share one "az rest" batch call instead of
+            # an az each, at the cost of az's own output flattening.
+            from arm_rest import AzCliBatcher
+            self._run_batch = AzCliBatcher(config.subscription_id, self._executor).run_many
+        self._vnet_lists: dict[Optional[str], Future] = {}
+        self._vnet_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Shut down the detail-call worker threads; the collector can't be used afterwards."""
+        self._executor.shutdown()
+
+    def __enter__(self) -> "AzureCollector":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _list_vnets(self, resource_group: Optional[str] = None) -> list:
+        """
+        List VNets once per scope for collect_vnets, collect_subnets and collect_peerings.
+
+        The collectors run concurrently, so the first caller makes the az call
+        and the others wait for its result instead of issuing their own.
+        """
+        with self._vnet_lock:
+            future = self._vnet_lists.get(resource_group)
+            is_owner = future is None
+            if is_owner:
+                future = self._vnet_lists[resource_group] = Future()
+
+        if is_owner:
+            cmd = ["network", "vnet", "list", *self._sub_args]
+            if resource_group:
+                cmd.extend(["--resource-group", resource_group])
+            try:
+                future.set_result(self._run_list(cmd))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def _run_list(self, command: list[str], stream: bool = False) -> list:
+        """
+        Run a list command, returning [] if it failed or printed something else.
+
+        stream=True lets Azure CLI output be parsed incrementally, for lists
+        that can run to hundreds of megabytes on large tenants.
+        """
+        if stream and self._run_command is run_az_command:
+            result = run_az_command(command, stream=True)
+        else:
+            result = self._run_command(command)
+        return result if isinstance(result, list) else []
+
+    def _run_az_commands(self, commands: list[list[str]]) -> list[list]:
+        """Run independent list commands concurrently, results in input order."""
+        if self._run_batch is not None:
+            return [r if isinstance(r, list) else [] for r in self._run_batch(commands)]
+        return list(self._executor.map(self._run_list, commands))
 
     def _filter_by_resource_groups(self, resources: list[dict]) -> list[dict]:
         """Filter resources by configured resource groups."""
-        if not self.config.resource_groups:
+        rg_set = self._rg_set
+        if not rg_set:
             return resources
 
-        rg_set = {rg.lower() for rg in self.config.resource_groups}
         return [
             r for r in resources
             if r.get('resourceGroup', '').lower() in rg_set
         ]
 
-    def collect_vnets(self) -> list:
+    @_per_resource_group
+    def collect_vnets(self, resource_group: Optional[str] = None) -> list:
         """Collect all Virtual Networks."""
         logger.info("Collecting Virtual Networks...")
-        cmd = ["network", "vnet", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
-
-        vnets = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        vnets = self._filter_by_resource_groups(self._list_vnets(resource_group))
 
         # Enrich with subnet details
         for vnet in vnets:
-            vnet["subnets_detail"] = []
-            for subnet in vnet.get("subnets", []):
-                subnet_info = {
-                    "name": subnet.get("name"),
-                    "id": subnet.get("id"),
-                    "addressPrefix": subnet.get("addressPrefix"),
-                    "addressPrefixes": subnet.get("addressPrefixes", []),
-                    "nsg": subnet.get("networkSecurityGroup", {}).get("id") if subnet.get("networkSecurityGroup") else None,
-                    "routeTable": subnet.get("routeTable", {}).get("id") if subnet.get("routeTable") else None,
-                    "serviceEndpoints": [se.get("service") for se in subnet.get("serviceEndpoints", [])],
-                    "delegations": [d.get("serviceName") for d in subnet.get("delegations", [])],
-                    "privateEndpointNetworkPolicies": subnet.get("privateEndpointNetworkPolicies"),
-                    "natGateway": subnet.get("natGateway", {}).get("id") if subnet.get("natGateway") else None,
-                }
-                vnet["subnets_detail"].append(subnet_info)
+            vnet["subnets_detail"] = [_subnet_detail(subnet) for subnet in vnet.get("subnets", [])]
 
         logger.info(f"Found {len(vnets)} VNets")
         return vnets
 
-    def collect_subnets(self) -> list:
+    @_per_resource_group
+    def collect_subnets(self, resource_group: Optional[str] = None) -> list:
         """Collect all subnets with their configurations."""
         logger.info("Collecting Subnets...")
-        subnets = []
 
         # Get subnets from vnets
-        cmd = ["network", "vnet", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        vnets = self._list_vnets(resource_group)
 
-        vnets = run_az_command(cmd) or []
-
-        for vnet in vnets:
-            vnet_name = vnet.get("name")
-            rg = vnet.get("resourceGroup")
-
-            for subnet in vnet.get("subnets", []):
-                subnet_data = {
-                    "name": subnet.get("name"),
-                    "id": subnet.get("id"),
-                    "vnet": vnet_name,
-                    "resourceGroup": rg,
-                    "addressPrefix": subnet.get("addressPrefix"),
-                    "addressPrefixes": subnet.get("addressPrefixes", []),
-                    "nsg_id": subnet.get("networkSecurityGroup", {}).get("id") if subnet.get("networkSecurityGroup") else None,
-                    "routeTable_id": subnet.get("routeTable", {}).get("id") if subnet.get("routeTable") else None,
-                    "serviceEndpoints": subnet.get("serviceEndpoints", []),
-                    "delegations": subnet.get("delegations", []),
-                    "ipConfigurations": subnet.get("ipConfigurations", []),
-                    "privateEndpoints": subnet.get("privateEndpoints", []),
-                }
-                subnets.append(subnet_data)
+        subnets = [
+            _subnet_record(subnet, vnet.get("name"), vnet.get("resourceGroup"))
+            for vnet in vnets
+            for subnet in vnet.get("subnets", [])
+        ]
 
         logger.info(f"Found {len(subnets)} Subnets")
         return subnets
 
-    def collect_nsgs(self) -> list:
+    @_per_resource_group
+    def collect_nsgs(self, resource_group: Optional[str] = None) -> list:
         """Collect all Network Security Groups with rules."""
         logger.info("Collecting Network Security Groups...")
-        cmd = ["network", "nsg", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "nsg", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        nsgs = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        nsgs = self._filter_by_resource_groups(self._run_list(cmd))
 
         # Enrich with full rule details
         for nsg in nsgs:
-            nsg_name = nsg.get("name")
-            rg = nsg.get("resourceGroup")
-
-            # Get detailed rules
-            rules_cmd = ["network", "nsg", "rule", "list",
-                        "--nsg-name", nsg_name,
-                        "--resource-group", rg]
-            if self.config.subscription_id:
-                rules_cmd.extend(["--subscription", self.config.subscription_id])
-
-            rules = run_az_command(rules_cmd) or []
-            nsg["customRules"] = rules
+            # The list output already embeds every custom rule, so there is
+            # no need for a per-NSG "az network nsg rule list" call.
+            nsg["customRules"] = nsg.get("securityRules", [])
 
             # Parse default rules
-            nsg["defaultRulesProcessed"] = []
-            for rule in nsg.get("defaultSecurityRules", []):
-                nsg["defaultRulesProcessed"].append({
-                    "name": rule.get("name"),
-                    "priority": rule.get("priority"),
-                    "direction": rule.get("direction"),
-                    "access": rule.get("access"),
-                    "protocol": rule.get("protocol"),
-                    "sourceAddressPrefix": rule.get("sourceAddressPrefix"),
-                    "sourcePortRange": rule.get("sourcePortRange"),
-                    "destinationAddressPrefix": rule.get("destinationAddressPrefix"),
-                    "destinationPortRange": rule.get("destinationPortRange"),
-                })
+            nsg["defaultRulesProcessed"] = [
+                _default_rule_record(rule) for rule in nsg.get("defaultSecurityRules", ())
+            ]
+            if self._strip_raw:
+                nsg.pop("defaultSecurityRules", None)
 
         logger.info(f"Found {len(nsgs)} NSGs")
         return nsgs
 
-    def collect_firewalls(self) -> list:
+    @_per_resource_group
+    def collect_firewalls(self, resource_group: Optional[str] = None) -> list:
         """Collect Azure Firewalls."""
         logger.info("Collecting Azure Firewalls...")
-        cmd = ["network", "firewall", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "firewall", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        firewalls = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        firewalls = self._filter_by_resource_groups(self._run_list(cmd))
 
         for fw in firewalls:
             # Extract IP configurations
-            fw["ipConfigurations_processed"] = []
-            for ip_config in fw.get("ipConfigurations", []):
-                fw["ipConfigurations_processed"].append({
-                    "name": ip_config.get("name"),
-                    "privateIpAddress": ip_config.get("privateIpAddress"),
-                    "publicIpAddress": ip_config.get("publicIpAddress", {}).get("id") if ip_config.get("publicIpAddress") else None,
-                    "subnet": ip_config.get("subnet", {}).get("id") if ip_config.get("subnet") else None,
-                })
+            fw["ipConfigurations_processed"] = [
+                _firewall_ip_config_record(ip_config) for ip_config in fw.get("ipConfigurations", ())
+            ]
+            if self._strip_raw:
+                fw.pop("ipConfigurations", None)
 
         logger.info(f"Found {len(firewalls)} Azure Firewalls")
         return firewalls
 
-    def collect_firewall_policies(self) -> list:
+    @_per_resource_group
+    def collect_firewall_policies(self, resource_group: Optional[str] = None) -> list:
         """Collect Firewall Policies with rule collections."""
         logger.info("Collecting Firewall Policies...")
-        cmd = ["network", "firewall", "policy", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "firewall", "policy", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        policies = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        policies = self._filter_by_resource_groups(self._run_list(cmd))
 
+        # Get rule collection groups
+        rcg_cmds = []
         for policy in policies:
-            policy_name = policy.get("name")
-            rg = policy.get("resourceGroup")
-
-            # Get rule collection groups
             rcg_cmd = ["network", "firewall", "policy", "rule-collection-group", "list",
-                      "--policy-name", policy_name,
-                      "--resource-group", rg]
-            if self.config.subscription_id:
-                rcg_cmd.extend(["--subscription", self.config.subscription_id])
-
-            rcgs = run_az_command(rcg_cmd) or []
-            policy["ruleCollectionGroups_detail"] = []
-
-            for rcg in rcgs:
-                rcg_data = {
-                    "name": rcg.get("name"),
-                    "priority": rcg.get("priority"),
-                    "ruleCollections": []
-                }
-
-                for rc in rcg.get("ruleCollections", []):
-                    rc_data = {
-                        "name": rc.get("name"),
-                        "priority": rc.get("priority"),
-                        "ruleCollectionType": rc.get("ruleCollectionType"),
-                        "action": rc.get("action", {}).get("type") if rc.get("action") else None,
-                        "rules": []
-                    }
-
-                    for rule in rc.get("rules", []):
-                        rule_data = {
-                            "name": rule.get("name"),
-                            "ruleType": rule.get("ruleType"),
-                            "sourceAddresses": rule.get("sourceAddresses", []),
-                            "sourceIpGroups": rule.get("sourceIpGroups", []),
-                            "destinationAddresses": rule.get("destinationAddresses", []),
-                            "destinationIpGroups": rule.get("destinationIpGroups", []),
-                            "destinationFqdns": rule.get("destinationFqdns", []),
-                            "destinationPorts": rule.get("destinationPorts", []),
-                            "protocols": rule.get("protocols", []),
-                            "targetFqdns": rule.get("targetFqdns", []),
-                            "targetUrls": rule.get("targetUrls", []),
-                            "ipProtocols": rule.get("ipProtocols", []),
-                            "translatedAddress": rule.get("translatedAddress"),
-                            "translatedPort": rule.get("translatedPort"),
-                        }
-                        rc_data["rules"].append(rule_data)
-
-                    rcg_data["ruleCollections"].append(rc_data)
-
-                policy["ruleCollectionGroups_detail"].append(rcg_data)
+                      "--policy-name", policy.get("name"),
+                      "--resource-group", policy.get("resourceGroup"),
+                      "--query", RULE_COLLECTION_GROUP_QUERY, *self._sub_args]
+            rcg_cmds.append(rcg_cmd)
+
+        if self._run_batch is not None and len(rcg_cmds) > 1:
+            details = [
+                [_rule_collection_group_record(rcg) for rcg in rcgs]
+                for rcgs in self._run_az_commands(rcg_cmds)
+            ]
+        else:
+            details = self._executor.map(self._collect_rule_collection_groups, rcg_cmds)
+        for policy, rcg_details in zip(policies, details):
+            policy["ruleCollectionGroups_detail"] = rcg_details
 
         logger.info(f"Found {len(policies)} Firewall Policies")
         return policies
 
-    def collect_route_tables(self) -> list:
+    def _collect_rule_collection_groups(self, rcg_cmd: list[str]) -> list:
+        """
+        Fetch one policy's rule collection groups, keeping only documented fields.
+
+        Runs in a worker thread so that, with simdjson, the response can be read
+        lazily and only the projected fields are ever materialized.
+        """
+        if self._run_command is run_az_command:
+            rcgs = run_az_command(rcg_cmd, lazy=True)
+        else:
+            rcgs = self._run_list(rcg_cmd)
+
+        return [_rule_collection_group_record(rcg) for rcg in rcgs or ()]
+
+    @_per_resource_group
+    def collect_route_tables(self, resource_group: Optional[str] = None) -> list:
         """Collect Route Tables."""
         logger.info("Collecting Route Tables...")
-        cmd = ["network", "route-table", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "route-table", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        route_tables = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        route_tables = self._filter_by_resource_groups(self._run_list(cmd, stream=True))
 
         for rt in route_tables:
-            rt["routes_processed"] = []
-            for route in rt.get("routes", []):
-                rt["routes_processed"].append({
+            rt["routes_processed"] = [
+                {
                     "name": route.get("name"),
                     "addressPrefix": route.get("addressPrefix"),
                     "nextHopType": route.get("nextHopType"),
                     "nextHopIpAddress": route.get("nextHopIpAddress"),
-                })
+                }
+                for route in rt.get("routes", [])
+            ]
+            if self._strip_raw:
+                rt.pop("routes", None)
 
         logger.info(f"Found {len(route_tables)} Route Tables")
         return route_tables
 
-    def collect_private_endpoints(self) -> list:
+    @_per_resource_group
+    def collect_private_endpoints(self, resource_group: Optional[str] = None) -> list:
         """Collect Private Endpoints."""
         logger.info("Collecting Private Endpoints...")
-        cmd = ["network", "private-endpoint", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "private-endpoint", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        endpoints = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        endpoints = self._filter_by_resource_groups(self._run_list(cmd))
 
         for ep in endpoints:
-            ep["connections"] = []
-            for conn in ep.get("privateLinkServiceConnections", []) + ep.get("manualPrivateLinkServiceConnections", []):
-                ep["connections"].append({
-                    "name": conn.get("name"),
-                    "privateLinkServiceId": conn.get("privateLinkServiceId"),
-                    "groupIds": conn.get("groupIds", []),
-                    "status": conn.get("privateLinkServiceConnectionState", {}).get("status"),
-                })
+            ep["connections"] = [
+                _endpoint_connection_record(conn)
+                for conn in chain(ep.get("privateLinkServiceConnections", ()),
+                                  ep.get("manualPrivateLinkServiceConnections", ()))
+            ]
 
         logger.info(f"Found {len(endpoints)} Private Endpoints")
         return endpoints
 
-    def collect_peerings(self) -> list:
+    @_per_resource_group
+    def collect_peerings(self, resource_group: Optional[str] = None) -> list:
         """Collect VNet Peerings."""
         logger.info("Collecting VNet Peerings...")
         peerings = []
 
-        cmd = ["network", "vnet", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
-
-        vnets = run_az_command(cmd) or []
+        vnets = self._list_vnets(resource_group)
 
+        # Peerings are embedded in the VNet list output, so one call covers
+        # every VNet instead of a "peering list" per VNet.
         for vnet in vnets:
             vnet_name = vnet.get("name")
             rg = vnet.get("resourceGroup")
 
-            peering_cmd = ["network", "vnet", "peering", "list",
-                          "--vnet-name", vnet_name,
-                          "--resource-group", rg]
-            if self.config.subscription_id:
-                peering_cmd.extend(["--subscription", self.config.subscription_id])
-
-            vnet_peerings = run_az_command(peering_cmd) or []
-
-            for peering in vnet_peerings:
+            for peering in vnet.get("virtualNetworkPeerings") or []:
                 peerings.append({
                     "name": peering.get("name"),
                     "id": peering.get("id"),
                     "sourceVnet": vnet_name,
                     "sourceResourceGroup": rg,
-                    "remoteVnetId": peering.get("remoteVirtualNetwork", {}).get("id"),
+                    "remoteVnetId": _ref_id(peering, "remoteVirtualNetwork"),
                     "peeringState": peering.get("peeringState"),
                     "allowVirtualNetworkAccess": peering.get("allowVirtualNetworkAccess"),
                     "allowForwardedTraffic": peering.get("allowForwardedTraffic"),
@@ -325,94 +631,98 @@ class AzureCollector:
         logger.info(f"Found {len(peerings)} VNet Peerings")
         return peerings
 
-    def collect_public_ips(self) -> list:
+    @_per_resource_group
+    def collect_public_ips(self, resource_group: Optional[str] = None) -> list:
         """Collect Public IP Addresses."""
         logger.info("Collecting Public IPs...")
-        cmd = ["network", "public-ip", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "public-ip", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        public_ips = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        public_ips = self._filter_by_resource_groups(self._run_list(cmd, stream=True))
         logger.info(f"Found {len(public_ips)} Public IPs")
         return public_ips
 
-    def collect_private_dns_zones(self) -> list:
+    @_per_resource_group
+    def collect_private_dns_zones(self, resource_group: Optional[str] = None) -> list:
         """Collect Private DNS Zones."""
         logger.info("Collecting Private DNS Zones...")
-        cmd = ["network", "private-dns", "zone", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "private-dns", "zone", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        zones = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        zones = self._filter_by_resource_groups(self._run_list(cmd))
 
+        # Get virtual network links
+        links_cmds = []
         for zone in zones:
-            zone_name = zone.get("name")
-            rg = zone.get("resourceGroup")
-
-            # Get virtual network links
             links_cmd = ["network", "private-dns", "link", "vnet", "list",
-                        "--zone-name", zone_name,
-                        "--resource-group", rg]
-            if self.config.subscription_id:
-                links_cmd.extend(["--subscription", self.config.subscription_id])
+                        "--zone-name", zone.get("name"),
+                        "--resource-group", zone.get("resourceGroup"), *self._sub_args]
+            links_cmds.append(links_cmd)
 
-            links = run_az_command(links_cmd) or []
+        for zone, links in zip(zones, self._run_az_commands(links_cmds)):
             zone["virtualNetworkLinks"] = links
 
         logger.info(f"Found {len(zones)} Private DNS Zones")
         return zones
 
-    def collect_app_gateways(self) -> list:
+    @_per_resource_group
+    def collect_app_gateways(self, resource_group: Optional[str] = None) -> list:
         """Collect Application Gateways."""
         logger.info("Collecting Application Gateways...")
-        cmd = ["network", "application-gateway", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "application-gateway", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        gateways = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        gateways = self._filter_by_resource_groups(self._run_list(cmd))
         logger.info(f"Found {len(gateways)} Application Gateways")
         return gateways
 
-    def collect_load_balancers(self) -> list:
+    @_per_resource_group
+    def collect_load_balancers(self, resource_group: Optional[str] = None) -> list:
         """Collect Load Balancers."""
         logger.info("Collecting Load Balancers...")
-        cmd = ["network", "lb", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "lb", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        lbs = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        lbs = self._filter_by_resource_groups(self._run_list(cmd))
         logger.info(f"Found {len(lbs)} Load Balancers")
         return lbs
 
-    def collect_vnet_gateways(self) -> list:
+    @_per_resource_group
+    def collect_vnet_gateways(self, resource_group: Optional[str] = None) -> list:
         """Collect Virtual Network Gateways."""
         logger.info("Collecting VNet Gateways...")
-        cmd = ["network", "vnet-gateway", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "vnet-gateway", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        gateways = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        gateways = self._filter_by_resource_groups(self._run_list(cmd))
         logger.info(f"Found {len(gateways)} VNet Gateways")
         return gateways
 
-    def collect_bastion_hosts(self) -> list:
+    @_per_resource_group
+    def collect_bastion_hosts(self, resource_group: Optional[str] = None) -> list:
         """Collect Bastion Hosts."""
         logger.info("Collecting Bastion Hosts...")
-        cmd = ["network", "bastion", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "bastion", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        bastions = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        bastions = self._filter_by_resource_groups(self._run_list(cmd))
         logger.info(f"Found {len(bastions)} Bastion Hosts")
         return bastions
 
-    def collect_network_interfaces(self) -> list:
+    @_per_resource_group
+    def collect_network_interfaces(self, resource_group: Optional[str] = None) -> list:
         """Collect Network Interfaces."""
         logger.info("Collecting Network Interfaces...")
-        cmd = ["network", "nic", "list"]
-        if self.config.subscription_id:
-            cmd.extend(["--subscription", self.config.subscription_id])
+        cmd = ["network", "nic", "list", *self._sub_args]
+        if resource_group:
+            cmd.extend(["--resource-group", resource_group])
 
-        nics = self._filter_by_resource_groups(run_az_command(cmd) or [])
+        nics = self._filter_by_resource_groups(self._run_list(cmd, stream=True))
         logger.info(f"Found {len(nics)} Network Interfaces")
         return nics
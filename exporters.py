@@ -3,11 +3,174 @@ Exporters
 Export network documentation to various formats.
 """
 
-import json
+from collections import defaultdict
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
 from datetime import datetime
-
-from utils import extract_name_from_id
+from typing import Iterator, Sequence
+
+import utils
+from utils import dump_json, dump_msgpack, extract_name_from_id
+
+# Write buffer for streamed exports (fewer, larger write syscalls)
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+
+_priority_key = itemgetter('priority')
+
+# Static Markdown blocks, built once at import rather than on every export
+_HEADER_TEMPLATE = (
+    "# Azure Network Documentation\n"
+    "\n"
+    "*Generated: {ts}*\n"
+    "\n"
+    "---\n"
+    "\n"
+    "## Table of Contents\n"
+    "\n"
+    "1. [Summary](#summary)\n"
+    "2. [Virtual Networks](#virtual-networks)\n"
+    "3. [Subnets](#subnets)\n"
+    "4. [Network Security Groups](#network-security-groups)\n"
+    "5. [Azure Firewalls](#azure-firewalls)\n"
+    "6. [Firewall Policies](#firewall-policies)\n"
+    "7. [Route Tables](#route-tables)\n"
+    "8. [VNet Peerings](#vnet-peerings)\n"
+    "9. [Private Endpoints](#private-endpoints)\n"
+    "10. [Load Balancers](#load-balancers)\n"
+    "11. [Application Gateways](#application-gateways)\n"
+    "12. [Connectivity Analysis](#connectivity-analysis)\n"
+    "13. [Security Issues](#security-issues)\n"
+    "\n"
+    "---\n"
+)
+
+_VNET_SUBNETS_HEADER = (
+    "\n#### Subnets\n\n"
+    "| Subnet | Address Prefix | NSG | Route Table | Service Endpoints |\n"
+    "|--------|----------------|-----|-------------|-------------------|"
+)
+
+_NSG_RULES_HEADER = (
+    "\n#### Security Rules\n\n"
+    "| Priority | Name | Direction | Access | Protocol | Source | Dest | Ports |\n"
+    "|----------|------|-----------|--------|----------|--------|------|-------|"
+)
+
+_POLICY_RULES_HEADER = (
+    "| Rule | Type | Source | Destination | Ports | Protocols |\n"
+    "|------|------|--------|-------------|-------|-----------|"
+)
+
+_ROUTES_HEADER = (
+    "\n#### Routes\n\n"
+    "| Name | Address Prefix | Next Hop Type | Next Hop IP |\n"
+    "|------|----------------|---------------|-------------|"
+)
+
+
+# Summary table rows: (resource type label, key in the collected data)
+_SUMMARY_ROWS = (
+    ("Virtual Networks", "vnets"),
+    ("Subnets", "subnets"),
+    ("Network Security Groups", "nsgs"),
+    ("Azure Firewalls", "firewalls"),
+    ("Firewall Policies", "firewall_policies"),
+    ("Route Tables", "route_tables"),
+    ("VNet Peerings", "peerings"),
+    ("Private Endpoints", "private_endpoints"),
+    ("Public IPs", "public_ips"),
+    ("Load Balancers", "load_balancers"),
+    ("Application Gateways", "application_gateways"),
+    ("VNet Gateways", "virtual_network_gateways"),
+    ("Bastion Hosts", "bastion_hosts"),
+)
+
+
+def _empty_section(title: str, message: str) -> tuple:
+    """Lines of a section with nothing to list."""
+    return (f"## {title}", "", f"{message}\n")
+
+
+# Sections for resource types that were not found, built once at import
+_EMPTY_VNETS = _empty_section("Virtual Networks", "*No Virtual Networks found.*")
+_EMPTY_SUBNETS = _empty_section("Subnets", "*No Subnets found.*")
+_EMPTY_NSGS = _empty_section("Network Security Groups", "*No NSGs found.*")
+_EMPTY_FIREWALLS = _empty_section("Azure Firewalls", "*No Azure Firewalls found.*")
+_EMPTY_FIREWALL_POLICIES = _empty_section("Firewall Policies", "*No Firewall Policies found.*")
+_EMPTY_ROUTE_TABLES = _empty_section("Route Tables", "*No Route Tables found.*")
+_EMPTY_PEERINGS = _empty_section("VNet Peerings", "*No VNet Peerings found.*")
+_EMPTY_PRIVATE_ENDPOINTS = _empty_section("Private Endpoints", "*No Private Endpoints found.*")
+_EMPTY_LOAD_BALANCERS = _empty_section("Load Balancers", "*No Load Balancers found.*")
+_EMPTY_APP_GATEWAYS = _empty_section("Application Gateways", "*No Application Gateways found.*")
+
+
+def _by_priority(rules: list) -> list:
+    """Sort rules by priority, treating a missing priority as 0."""
+    try:
+        return sorted(rules, key=_priority_key)
+    except KeyError:
+        # Some rules have no priority (Azure always sets one on NSG rules)
+        return sorted(rules, key=lambda r: r.get('priority', 0))
+
+
+def _join_truncated(parts, limit: int, sep: str = ', ') -> str:
+    """Equivalent to sep.join(parts)[:limit], without joining past the limit."""
+    taken = []
+    length = -len(sep)
+    for part in parts:
+        taken.append(part)
+        length += len(sep) + len(part)
+        if length >= limit:
+            break
+    return sep.join(taken)[:limit]
+
+
+def _vnet_subnet_row(subnet: dict) -> str:
+    """Format a VNet's subnet as a Markdown table row."""
+    nsg = subnet.get('nsg', '-') or '-'
+    rt = subnet.get('routeTable', '-') or '-'
+    se = ', '.join(subnet.get('serviceEndpoints', [])) or '-'
+    prefix = subnet.get('addressPrefix') or ', '.join(subnet.get('addressPrefixes', []))
+    return f"| {subnet.get('name')} | {prefix} | {nsg} | {rt} | {se} |"
+
+
+def _nsg_rule_row(rule: dict) -> str:
+    """Format an NSG security rule as a Markdown table row."""
+    src = rule.get('sourceAddressPrefix') or _join_truncated(rule.get('sourceAddressPrefixes', []), 20)
+    dst = rule.get('destinationAddressPrefix') or _join_truncated(rule.get('destinationAddressPrefixes', []), 20)
+    ports = rule.get('destinationPortRange') or ', '.join(rule.get('destinationPortRanges', []))
+    return (
+        f"| {rule.get('priority')} | {rule.get('name')} | {rule.get('direction')} | "
+        f"**{rule.get('access')}** | {rule.get('protocol')} | {src[:20]} | {dst[:20]} | {ports} |"
+    )
+
+
+def _protocol_label(protocol) -> str:
+    """Label an application rule protocol ({protocolType, port}) like "Https:443"."""
+    if isinstance(protocol, dict):
+        return f"{protocol.get('protocolType')}:{protocol.get('port')}"
+    return protocol
+
+
+def _policy_rule_row(rule: dict) -> str:
+    """Format a firewall policy rule as a Markdown table row."""
+    src = ', '.join(rule.get('sourceAddresses', ())[:2]) or '*'
+    dst = _join_truncated(
+        chain(rule.get('destinationAddresses', ()), rule.get('destinationFqdns', ()), rule.get('targetFqdns', ())),
+        30,
+    ) or '*'
+    ports = ', '.join(rule.get('destinationPorts', ())) or '*'
+    protocols = ', '.join(chain(map(_protocol_label, rule.get('protocols', ())), rule.get('ipProtocols', ()))) or '*'
+    return f"| {rule.get('name')} | {rule.get('ruleType')} | {src} | {dst} | {ports} | {protocols} |"
+
+
+def _connectivity_row(subnet_name: str, info: dict) -> str:
+    """Format a subnet's connectivity summary as a Markdown table row."""
+    return (
+        f"| {subnet_name} | {info.get('vnet', '-')} | {info.get('addressPrefix', '-')} | "
+        f"{info.get('nsg') or 'None'} | {'Yes' if info.get('has_internet_access') else 'No'} |"
+    )
 
 
 class MarkdownExporter:
@@ -17,118 +180,89 @@ class MarkdownExporter:
         """Export to Markdown file."""
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
-        md = self._build_markdown(network_data, connectivity)
-
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(md)
+        # Write each section as soon as it is built, so only one section's
+        # lines are ever held in memory rather than the whole document.
+        # newline='\n' skips newline translation and matches the JSON output.
+        with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE, newline='\n') as f:
+            first = True
+            for lines in self._build_sections(network_data, connectivity):
+                if not lines:
+                    continue
+                if not first:
+                    f.write("\n")
+                f.write("\n".join(lines))
+                first = False
 
         return output_path
 
-    def _build_markdown(self, data: dict, connectivity: dict) -> str:
-        """Build Markdown content."""
-        lines = [
-            "# Azure Network Documentation",
-            "",
-            f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*",
-            "",
-            "---",
-            "",
-            "## Table of Contents",
-            "",
-            "1. [Summary](#summary)",
-            "2. [Virtual Networks](#virtual-networks)",
-            "3. [Subnets](#subnets)",
-            "4. [Network Security Groups](#network-security-groups)",
-            "5. [Azure Firewalls](#azure-firewalls)",
-            "6. [Firewall Policies](#firewall-policies)",
-            "7. [Route Tables](#route-tables)",
-            "8. [VNet Peerings](#vnet-peerings)",
-            "9. [Private Endpoints](#private-endpoints)",
-            "10. [Load Balancers](#load-balancers)",
-            "11. [Application Gateways](#application-gateways)",
-            "12. [Connectivity Analysis](#connectivity-analysis)",
-            "13. [Security Issues](#security-issues)",
-            "",
-            "---",
-            "",
-        ]
+    def _build_sections(self, data: dict, connectivity: dict) -> Iterator[Sequence[str]]:
+        """Build the Markdown document section by section, as lists of lines."""
+        yield [_HEADER_TEMPLATE.format(ts=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))]
+
+        # Look up each resource list once; missing lists become ()
+        resources = {key: data.get(key) or () for _, key in _SUMMARY_ROWS}
 
         # Summary
-        lines.extend(self._build_summary(data))
+        yield self._build_summary(resources)
 
         # Virtual Networks
-        lines.extend(self._build_vnets_section(data.get("vnets", [])))
+        yield self._build_vnets_section(resources["vnets"])
 
         # Subnets
-        lines.extend(self._build_subnets_section(data.get("subnets", [])))
+        yield self._build_subnets_section(resources["subnets"])
 
         # NSGs
-        lines.extend(self._build_nsgs_section(data.get("nsgs", [])))
+        yield self._build_nsgs_section(resources["nsgs"])
 
         # Firewalls
-        lines.extend(self._build_firewalls_section(data.get("firewalls", [])))
+        yield self._build_firewalls_section(resources["firewalls"])
 
         # Firewall Policies
-        lines.extend(self._build_firewall_policies_section(data.get("firewall_policies", [])))
+        yield self._build_firewall_policies_section(resources["firewall_policies"])
 
         # Route Tables
-        lines.extend(self._build_route_tables_section(data.get("route_tables", [])))
+        yield self._build_route_tables_section(resources["route_tables"])
 
         # Peerings
-        lines.extend(self._build_peerings_section(data.get("peerings", [])))
+        yield self._build_peerings_section(resources["peerings"])
 
         # Private Endpoints
-        lines.extend(self._build_private_endpoints_section(data.get("private_endpoints", [])))
+        yield self._build_private_endpoints_section(resources["private_endpoints"])
 
         # Load Balancers
-        lines.extend(self._build_load_balancers_section(data.get("load_balancers", [])))
+        yield self._build_load_balancers_section(resources["load_balancers"])
 
         # Application Gateways
-        lines.extend(self._build_app_gateways_section(data.get("application_gateways", [])))
+        yield self._build_app_gateways_section(resources["application_gateways"])
 
         # Connectivity Analysis
-        lines.extend(self._build_connectivity_section(connectivity))
+        yield self._build_connectivity_section(connectivity)
 
         # Security Issues
-        lines.extend(self._build_issues_section(connectivity))
-
-        return "\n".join(lines)
+        yield self._build_issues_section(connectivity)
 
-    def _build_summary(self, data: dict) -> list:
+    def _build_summary(self, resources: dict) -> list:
         """Build summary section."""
         lines = [
             "## Summary",
             "",
             "| Resource Type | Count |",
             "|--------------|-------|",
-            f"| Virtual Networks | {len(data.get('vnets', []))} |",
-            f"| Subnets | {len(data.get('subnets', []))} |",
-            f"| Network Security Groups | {len(data.get('nsgs', []))} |",
-            f"| Azure Firewalls | {len(data.get('firewalls', []))} |",
-            f"| Firewall Policies | {len(data.get('firewall_policies', []))} |",
-            f"| Route Tables | {len(data.get('route_tables', []))} |",
-            f"| VNet Peerings | {len(data.get('peerings', []))} |",
-            f"| Private Endpoints | {len(data.get('private_endpoints', []))} |",
-            f"| Public IPs | {len(data.get('public_ips', []))} |",
-            f"| Load Balancers | {len(data.get('load_balancers', []))} |",
-            f"| Application Gateways | {len(data.get('application_gateways', []))} |",
-            f"| VNet Gateways | {len(data.get('virtual_network_gateways', []))} |",
-            f"| Bastion Hosts | {len(data.get('bastion_hosts', []))} |",
-            "",
         ]
+        lines.extend([f"| {label} | {len(resources[key])} |" for label, key in _SUMMARY_ROWS])
+        lines.append("")
         return lines
 
-    def _build_vnets_section(self, vnets: list) -> list:
+    def _build_vnets_section(self, vnets: list) -> Sequence[str]:
         """Build VNets section."""
+        if not vnets:
+            return _EMPTY_VNETS
+
         lines = [
             "## Virtual Networks",
             "",
         ]
 
-        if not vnets:
-            lines.append("*No Virtual Networks found.*\n")
-            return lines
-
         for vnet in vnets:
             lines.extend([
                 f"### {vnet.get('name')}",
@@ -142,51 +276,39 @@ class MarkdownExporter:
             if dns_servers:
                 lines.append(f"- **DNS Servers:** {', '.join(dns_servers)}")
 
-            lines.append("")
-            lines.append("#### Subnets")
-            lines.append("")
-            lines.append("| Subnet | Address Prefix | NSG | Route Table | Service Endpoints |")
-            lines.append("|--------|----------------|-----|-------------|-------------------|")
+            lines.append(_VNET_SUBNETS_HEADER)
 
-            for subnet in vnet.get('subnets_detail', []):
-                nsg = subnet.get('nsg', '-') or '-'
-                rt = subnet.get('routeTable', '-') or '-'
-                se = ', '.join(subnet.get('serviceEndpoints', [])) or '-'
-                prefix = subnet.get('addressPrefix') or ', '.join(subnet.get('addressPrefixes', []))
-                lines.append(f"| {subnet.get('name')} | {prefix} | {nsg} | {rt} | {se} |")
+            lines.extend([_vnet_subnet_row(subnet) for subnet in vnet.get('subnets_detail', [])])
 
             lines.append("")
 
         return lines
 
-    def _build_subnets_section(self, subnets: list) -> list:
+    def _build_subnets_section(self, subnets: list) -> Sequence[str]:
         """Build detailed subnets section."""
+        if not subnets:
+            return _EMPTY_SUBNETS
+
         lines = [
             "## Subnets",
             "",
         ]
 
-        if not subnets:
-            lines.append("*No Subnets found.*\n")
-            return lines
-
         # Group by VNet
-        by_vnet = {}
+        by_vnet = defaultdict(list)
         for subnet in subnets:
-            vnet = subnet.get('vnet', 'Unknown')
-            if vnet not in by_vnet:
-                by_vnet[vnet] = []
-            by_vnet[vnet].append(subnet)
+            by_vnet[subnet.get('vnet', 'Unknown')].append(subnet)
 
-        for vnet, vnet_subnets in sorted(by_vnet.items()):
-            lines.append(f"### VNet: {vnet}")
-            lines.append("")
+        for vnet in sorted(by_vnet):
+            vnet_subnets = by_vnet[vnet]
+            lines.append(f"### VNet: {vnet}\n")
 
             for subnet in vnet_subnets:
-                lines.append(f"#### {subnet.get('name')}")
-                lines.append("")
-                lines.append(f"- **Address Prefix:** {subnet.get('addressPrefix')}")
-                lines.append(f"- **Resource Group:** {subnet.get('resourceGroup')}")
+                lines.append(
+                    f"#### {subnet.get('name')}\n\n"
+                    f"- **Address Prefix:** {subnet.get('addressPrefix')}\n"
+                    f"- **Resource Group:** {subnet.get('resourceGroup')}"
+                )
 
                 if subnet.get('nsg_id'):
                     lines.append(f"- **NSG:** {extract_name_from_id(subnet.get('nsg_id'))}")
@@ -201,23 +323,23 @@ class MarkdownExporter:
                 if se:
                     lines.append(f"- **Service Endpoints:** {', '.join(se)}")
 
-                lines.append(f"- **IP Configurations:** {len(subnet.get('ipConfigurations', []))}")
-                lines.append(f"- **Private Endpoints:** {len(subnet.get('privateEndpoints', []))}")
-                lines.append("")
+                lines.append(
+                    f"- **IP Configurations:** {len(subnet.get('ipConfigurations', []))}\n"
+                    f"- **Private Endpoints:** {len(subnet.get('privateEndpoints', []))}\n"
+                )
 
         return lines
 
-    def _build_nsgs_section(self, nsgs: list) -> list:
+    def _build_nsgs_section(self, nsgs: list) -> Sequence[str]:
         """Build NSGs section."""
+        if not nsgs:
+            return _EMPTY_NSGS
+
         lines = [
             "## Network Security Groups",
             "",
         ]
 
-        if not nsgs:
-            lines.append("*No NSGs found.*\n")
-            return lines
-
         for nsg in nsgs:
             lines.extend([
                 f"### {nsg.get('name')}",
@@ -234,38 +356,25 @@ class MarkdownExporter:
             if associated_nics:
                 lines.append(f"- **Associated NICs:** {', '.join(associated_nics)}")
 
-            lines.append("")
-            lines.append("#### Security Rules")
-            lines.append("")
-            lines.append("| Priority | Name | Direction | Access | Protocol | Source | Dest | Ports |")
-            lines.append("|----------|------|-----------|--------|----------|--------|------|-------|")
-
-            all_rules = nsg.get('securityRules', []) + nsg.get('customRules', [])
-            for rule in sorted(all_rules, key=lambda r: r.get('priority', 0)):
-                src = rule.get('sourceAddressPrefix') or ', '.join(rule.get('sourceAddressPrefixes', []))
-                dst = rule.get('destinationAddressPrefix') or ', '.join(rule.get('destinationAddressPrefixes', []))
-                ports = rule.get('destinationPortRange') or ', '.join(rule.get('destinationPortRanges', []))
+            lines.append(_NSG_RULES_HEADER)
 
-                lines.append(
-                    f"| {rule.get('priority')} | {rule.get('name')} | {rule.get('direction')} | "
-                    f"**{rule.get('access')}** | {rule.get('protocol')} | {src[:20]} | {dst[:20]} | {ports} |"
-                )
+            all_rules = nsg.get('customRules') or nsg.get('securityRules', [])
+            lines.extend([_nsg_rule_row(rule) for rule in _by_priority(all_rules)])
 
             lines.append("")
 
         return lines
 
-    def _build_firewalls_section(self, firewalls: list) -> list:
+    def _build_firewalls_section(self, firewalls: list) -> Sequence[str]:
         """Build Azure Firewalls section."""
+        if not firewalls:
+            return _EMPTY_FIREWALLS
+
         lines = [
             "## Azure Firewalls",
             "",
         ]
 
-        if not firewalls:
-            lines.append("*No Azure Firewalls found.*\n")
-            return lines
-
         for fw in firewalls:
             lines.extend([
                 f"### {fw.get('name')}",
@@ -279,9 +388,7 @@ class MarkdownExporter:
             if fw.get('firewallPolicy'):
                 lines.append(f"- **Firewall Policy:** {extract_name_from_id(fw.get('firewallPolicy', {}).get('id'))}")
 
-            lines.append("")
-            lines.append("#### IP Configurations")
-            lines.append("")
+            lines.append("\n#### IP Configurations\n")
 
             for ip_config in fw.get('ipConfigurations_processed', []):
                 lines.append(f"- **{ip_config.get('name')}**")
@@ -294,17 +401,16 @@ class MarkdownExporter:
 
         return lines
 
-    def _build_firewall_policies_section(self, policies: list) -> list:
+    def _build_firewall_policies_section(self, policies: list) -> Sequence[str]:
         """Build Firewall Policies section."""
+        if not policies:
+            return _EMPTY_FIREWALL_POLICIES
+
         lines = [
             "## Firewall Policies",
             "",
         ]
 
-        if not policies:
-            lines.append("*No Firewall Policies found.*\n")
-            return lines
-
         for policy in policies:
             lines.extend([
                 f"### {policy.get('name')}",
@@ -317,38 +423,30 @@ class MarkdownExporter:
             ])
 
             for rcg in policy.get('ruleCollectionGroups_detail', []):
-                lines.append(f"#### Rule Collection Group: {rcg.get('name')} (Priority: {rcg.get('priority')})")
-                lines.append("")
+                lines.append(f"#### Rule Collection Group: {rcg.get('name')} (Priority: {rcg.get('priority')})\n")
 
                 for rc in rcg.get('ruleCollections', []):
-                    lines.append(f"##### {rc.get('name')} ({rc.get('ruleCollectionType')}) - Action: {rc.get('action')}")
-                    lines.append("")
-                    lines.append("| Rule | Type | Source | Destination | Ports | Protocols |")
-                    lines.append("|------|------|--------|-------------|-------|-----------|")
-
-                    for rule in rc.get('rules', []):
-                        src = ', '.join(rule.get('sourceAddresses', [])[:2]) or '*'
-                        dst = ', '.join(rule.get('destinationAddresses', []) + rule.get('destinationFqdns', []) + rule.get('targetFqdns', []))[:30] or '*'
-                        ports = ', '.join(rule.get('destinationPorts', [])) or '*'
-                        protocols = ', '.join(rule.get('protocols', []) + rule.get('ipProtocols', [])) or '*'
+                    lines.append(
+                        f"##### {rc.get('name')} ({rc.get('ruleCollectionType')}) - Action: {rc.get('action')}\n\n"
+                        + _POLICY_RULES_HEADER
+                    )
 
-                        lines.append(f"| {rule.get('name')} | {rule.get('ruleType')} | {src} | {dst} | {ports} | {protocols} |")
+                    lines.extend([_policy_rule_row(rule) for rule in rc.get('rules', [])])
 
                     lines.append("")
 
         return lines
 
-    def _build_route_tables_section(self, route_tables: list) -> list:
+    def _build_route_tables_section(self, route_tables: list) -> Sequence[str]:
         """Build Route Tables section."""
+        if not route_tables:
+            return _EMPTY_ROUTE_TABLES
+
         lines = [
             "## Route Tables",
             "",
         ]
 
-        if not route_tables:
-            lines.append("*No Route Tables found.*\n")
-            return lines
-
         for rt in route_tables:
             lines.extend([
                 f"### {rt.get('name')}",
@@ -362,88 +460,81 @@ class MarkdownExporter:
             if associated:
                 lines.append(f"- **Associated Subnets:** {', '.join(associated)}")
 
-            lines.append("")
-            lines.append("#### Routes")
-            lines.append("")
-            lines.append("| Name | Address Prefix | Next Hop Type | Next Hop IP |")
-            lines.append("|------|----------------|---------------|-------------|")
+            lines.append(_ROUTES_HEADER)
 
-            for route in rt.get('routes_processed', []):
-                lines.append(
-                    f"| {route.get('name')} | {route.get('addressPrefix')} | "
-                    f"{route.get('nextHopType')} | {route.get('nextHopIpAddress') or '-'} |"
-                )
+            lines.extend([
+                f"| {route.get('name')} | {route.get('addressPrefix')} | "
+                f"{route.get('nextHopType')} | {route.get('nextHopIpAddress') or '-'} |"
+                for route in rt.get('routes_processed', [])
+            ])
 
             lines.append("")
 
         return lines
 
-    def _build_peerings_section(self, peerings: list) -> list:
+    def _build_peerings_section(self, peerings: list) -> Sequence[str]:
         """Build VNet Peerings section."""
+        if not peerings:
+            return _EMPTY_PEERINGS
+
         lines = [
             "## VNet Peerings",
             "",
         ]
 
-        if not peerings:
-            lines.append("*No VNet Peerings found.*\n")
-            return lines
-
-        lines.append("| Source VNet | Peering Name | Remote VNet | State | VNet Access | Forwarded Traffic | Gateway Transit |")
-        lines.append("|-------------|--------------|-------------|-------|-------------|-------------------|-----------------|")
+        lines.append(
+            "| Source VNet | Peering Name | Remote VNet | State | VNet Access | Forwarded Traffic | Gateway Transit |\n"
+            "|-------------|--------------|-------------|-------|-------------|-------------------|-----------------|"
+        )
 
-        for peering in peerings:
-            remote = extract_name_from_id(peering.get('remoteVnetId', ''))
-            lines.append(
-                f"| {peering.get('sourceVnet')} | {peering.get('name')} | {remote} | "
-                f"{peering.get('peeringState')} | {peering.get('allowVirtualNetworkAccess')} | "
-                f"{peering.get('allowForwardedTraffic')} | {peering.get('allowGatewayTransit')} |"
-            )
+        lines.extend([
+            f"| {peering.get('sourceVnet')} | {peering.get('name')} | "
+            f"{extract_name_from_id(peering.get('remoteVnetId', ''))} | "
+            f"{peering.get('peeringState')} | {peering.get('allowVirtualNetworkAccess')} | "
+            f"{peering.get('allowForwardedTraffic')} | {peering.get('allowGatewayTransit')} |"
+            for peering in peerings
+        ])
 
         lines.append("")
         return lines
 
-    def _build_private_endpoints_section(self, endpoints: list) -> list:
+    def _build_private_endpoints_section(self, endpoints: list) -> Sequence[str]:
         """Build Private Endpoints section."""
+        if not endpoints:
+            return _EMPTY_PRIVATE_ENDPOINTS
+
         lines = [
             "## Private Endpoints",
             "",
         ]
 
-        if not endpoints:
-            lines.append("*No Private Endpoints found.*\n")
-            return lines
-
-        lines.append("| Name | Resource Group | Subnet | Target Resource | Group IDs | Status |")
-        lines.append("|------|----------------|--------|-----------------|-----------|--------|")
+        lines.append(
+            "| Name | Resource Group | Subnet | Target Resource | Group IDs | Status |\n"
+            "|------|----------------|--------|-----------------|-----------|--------|"
+        )
 
         for ep in endpoints:
             subnet = extract_name_from_id(ep.get('subnet', {}).get('id', '')) if ep.get('subnet') else '-'
-
-            for conn in ep.get('connections', []):
-                target = extract_name_from_id(conn.get('privateLinkServiceId', ''))
-                groups = ', '.join(conn.get('groupIds', []))
-                status = conn.get('status', '-')
-
-                lines.append(
-                    f"| {ep.get('name')} | {ep.get('resourceGroup')} | {subnet} | "
-                    f"{target} | {groups} | {status} |"
-                )
+            prefix = f"| {ep.get('name')} | {ep.get('resourceGroup')} | {subnet} | "
+            lines.extend([
+                f"{prefix}{extract_name_from_id(conn.get('privateLinkServiceId', ''))} | "
+                f"{', '.join(conn.get('groupIds', []))} | {conn.get('status', '-')} |"
+                for conn in ep.get('connections', [])
+            ])
 
         lines.append("")
         return lines
 
-    def _build_load_balancers_section(self, lbs: list) -> list:
+    def _build_load_balancers_section(self, lbs: list) -> Sequence[str]:
         """Build Load Balancers section."""
+        if not lbs:
+            return _EMPTY_LOAD_BALANCERS
+
         lines = [
             "## Load Balancers",
             "",
         ]
 
-        if not lbs:
-            lines.append("*No Load Balancers found.*\n")
-            return lines
-
         for lb in lbs:
             lines.extend([
                 f"### {lb.get('name')}",
@@ -459,17 +550,16 @@ class MarkdownExporter:
 
         return lines
 
-    def _build_app_gateways_section(self, gateways: list) -> list:
+    def _build_app_gateways_section(self, gateways: list) -> Sequence[str]:
         """Build Application Gateways section."""
+        if not gateways:
+            return _EMPTY_APP_GATEWAYS
+
         lines = [
             "## Application Gateways",
             "",
         ]
 
-        if not gateways:
-            lines.append("*No Application Gateways found.*\n")
-            return lines
-
         for gw in gateways:
             lines.extend([
                 f"### {gw.get('name')}",
@@ -497,16 +587,13 @@ class MarkdownExporter:
             lines.append("*No connectivity data available.*\n")
             return lines
 
-        lines.append("### Subnet Connectivity")
-        lines.append("")
-        lines.append("| Subnet | VNet | Address Prefix | NSG | Internet Access |")
-        lines.append("|--------|------|----------------|-----|-----------------|")
+        lines.append(
+            "### Subnet Connectivity\n\n"
+            "| Subnet | VNet | Address Prefix | NSG | Internet Access |\n"
+            "|--------|------|----------------|-----|-----------------|"
+        )
 
-        for subnet_name, info in sorted(subnets.items()):
-            lines.append(
-                f"| {subnet_name} | {info.get('vnet', '-')} | {info.get('addressPrefix', '-')} | "
-                f"{info.get('nsg') or 'None'} | {'Yes' if info.get('has_internet_access') else 'No'} |"
-            )
+        lines.extend([_connectivity_row(name, subnets[name]) for name in sorted(subnets)])
 
         lines.append("")
         return lines
@@ -549,16 +636,50 @@ class JSONExporter:
         """Export to JSON file."""
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
-        export_data = {
-            "metadata": {
-                "exported_at": datetime.now().isoformat(),
-                "version": "1.0"
-            },
-            "network_data": network_data,
-            "graph": graph_data
+        metadata = {
+            "exported_at": datetime.now(),
+            "version": "1.0"
         }
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, default=str)
+        # Stream the document one resource category at a time so only the
+        # largest category is ever encoded in memory, not the whole export.
+        # The large buffer coalesces the many small per-item writes.
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(b"{")
+            self._write_key(f, "metadata", 1)
+            self._write_value(f, metadata, 1)
+            f.write(b",")
+            self._write_key(f, "network_data", 1)
+            self._write_object(f, network_data, 1)
+            f.write(b",")
+            self._write_key(f, "graph", 1)
+            self._write_value(f, graph_data, 1)
+            f.write(b"\n}")
+
+        # Binary copy of the collected data for fast --from-json reloads
+        if utils.msgpack is not None:
+            Path(output_path).with_suffix(".msgpack").write_bytes(dump_msgpack(network_data))
 
         return output_path
+
+    def _write_object(self, f, obj: dict, level: int) -> None:
+        """Write a dict member by member at the given nesting level."""
+        if not obj:
+            f.write(b"{}")
+            return
+
+        f.write(b"{")
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                f.write(b",")
+            self._write_key(f, key, level + 1)
+            self._write_value(f, value, level + 1)
+        f.write(b"\n" + b"  " * level + b"}")
+
+    def _write_key(self, f, key: str, level: int) -> None:
+        """Write an indented object key."""
+        f.write(b"\n" + b"  " * level + dump_json(str(key)) + b": ")
+
+    def _write_value(self, f, value, level: int) -> None:
+        """Write a value, re-indenting nested lines to the given level."""
+        f.write(dump_json(value, indent=True).replace(b"\n", b"\n" + b"  " * level))
@@ -3,12 +3,20 @@ Network Graph Builder
 Builds a graph representation of the Azure network and analyzes connectivity.
 """
 
+import ipaddress
+import sys
+from collections import defaultdict
 from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain
 from typing import Optional
 
 from utils import extract_name_from_id
 
 
+# Shared stand-in for absent sub-objects, never mutated
+_EMPTY: dict = {}
+
 # Security analysis constants
 RISKY_PORTS = {
     "22": "SSH - Remote access",
@@ -24,8 +32,75 @@ RISKY_PORTS = {
 
 INTERNET_SOURCES = {"*", "Internet", "0.0.0.0/0", "Any"}
 
+# Bit p set for each risky port p, to test a rule's ports in one AND
+RISKY_PORT_MASK = sum(1 << int(port) for port in RISKY_PORTS)
+ALL_PORTS_MASK = (1 << 65536) - 1
+
+
+def _intern(value):
+    """Intern a string value, passing anything else (e.g. None) through."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _ref_id(obj: dict, key: str) -> Optional[str]:
+    """Get the resource ID of an optional sub-resource reference."""
+    return (obj.get(key) or _EMPTY).get("id")
 
-@dataclass
+
+def _ref_name(obj: dict, key: str) -> Optional[str]:
+    """Get the name of an optional sub-resource reference, None if it is absent."""
+    ref = obj.get(key)
+    return extract_name_from_id(ref.get("id")) if ref else None
+
+
+@lru_cache(maxsize=4096)
+def is_internet_source(source: str) -> bool:
+    """
+    Check whether a rule source means "anywhere on the internet".
+
+    Besides the INTERNET_SOURCES keywords this accepts any /0 prefix,
+    e.g. "::/0" or "0.0.0.0/0" written with host bits. The result is
+    cached since rules repeat the same few CIDRs.
+    """
+    if source in INTERNET_SOURCES:
+        return True
+    try:
+        return ipaddress.ip_network(source.strip(), strict=False).prefixlen == 0
+    except ValueError:
+        return False
+
+
+@lru_cache(maxsize=1024)
+def parse_port_mask(ports: str) -> int:
+    """
+    Parse a rule's port string into a bit mask of the ports it covers.
+
+    Accepts the comma-separated forms used in access rules: "*", single
+    ports, "lo-hi" ranges and "port/protocol" entries. Anything else is
+    ignored.
+
+    Args:
+        ports: Port string, e.g. "22, 80-90" or "*"
+
+    Returns:
+        Integer with bit p set for every covered port p
+    """
+    mask = 0
+    for entry in ports.split(","):
+        entry = entry.strip().partition("/")[0]
+        if entry in ("*", "Any"):
+            return ALL_PORTS_MASK
+        lo, sep, hi = entry.partition("-")
+        if not lo.isdigit() or (sep and not hi.isdigit()):
+            continue
+        lo = int(lo)
+        hi = int(hi) if sep else lo
+        if lo <= hi <= 65535:
+            mask |= (1 << (hi + 1)) - (1 << lo)
+    return mask
+
+
+@dataclass(slots=True)
 class NetworkNode:
     """Represents a node in the network graph."""
     id: str
@@ -36,7 +111,7 @@ class NetworkNode:
     parent_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkEdge:
     """Represents a connection/relationship between nodes."""
     source_id: str
@@ -46,7 +121,7 @@ class NetworkEdge:
     bidirectional: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class AccessRule:
     """Represents a network access rule."""
     source: str
@@ -58,6 +133,16 @@ class AccessRule:
     rule_source: str  # NSG name, Firewall policy, etc.
     direction: str  # Inbound/Outbound
 
+    def __post_init__(self) -> None:
+        # Rule fields repeat heavily ("*", "Internet", "Tcp", "443", ...);
+        # intern them so thousands of rules share one string per value
+        self.source = _intern(self.source)
+        self.destination = _intern(self.destination)
+        self.port = _intern(self.port)
+        self.protocol = _intern(self.protocol)
+        self.action = _intern(self.action)
+        self.direction = _intern(self.direction)
+
 
 class NetworkGraphBuilder:
     """Builds and analyzes network topology graph."""
@@ -67,57 +152,63 @@ class NetworkGraphBuilder:
         self.edges: list[NetworkEdge] = []
         self.access_rules: list[AccessRule] = []
         self.connectivity_matrix: dict = {}
+        # VNet name -> node ID, first VNet wins like the old scan did
+        self._vnet_name_index: dict[str, str] = {}
+        # Edge type -> edges of that type, in insertion order
+        self._edges_by_type: dict[str, list[NetworkEdge]] = defaultdict(list)
 
     def build(self, network_data: dict) -> dict:
         """Build the network graph from collected data."""
         self.nodes.clear()
         self.edges.clear()
         self.access_rules.clear()
+        self._vnet_name_index.clear()
+        self._edges_by_type.clear()
 
         # Process VNets
-        self._process_vnets(network_data.get("vnets", []))
+        self._process_vnets(network_data.get("vnets", ()))
 
         # Process Subnets
-        self._process_subnets(network_data.get("subnets", []))
+        self._process_subnets(network_data.get("subnets", ()))
 
         # Process NSGs
-        self._process_nsgs(network_data.get("nsgs", []))
+        self._process_nsgs(network_data.get("nsgs", ()))
 
         # Process Firewalls
-        self._process_firewalls(network_data.get("firewalls", []))
+        self._process_firewalls(network_data.get("firewalls", ()))
 
         # Process Firewall Policies
-        self._process_firewall_policies(network_data.get("firewall_policies", []))
+        self._process_firewall_policies(network_data.get("firewall_policies", ()))
 
         # Process Route Tables
-        self._process_route_tables(network_data.get("route_tables", []))
+        self._process_route_tables(network_data.get("route_tables", ()))
 
         # Process Private Endpoints
-        self._process_private_endpoints(network_data.get("private_endpoints", []))
+        self._process_private_endpoints(network_data.get("private_endpoints", ()))
 
         # Process Peerings
-        self._process_peerings(network_data.get("peerings", []))
+        self._process_peerings(network_data.get("peerings", ()))
 
         # Process Public IPs
-        self._process_public_ips(network_data.get("public_ips", []))
+        self._process_public_ips(network_data.get("public_ips", ()))
 
         # Process Application Gateways
-        self._process_app_gateways(network_data.get("application_gateways", []))
+        self._process_app_gateways(network_data.get("application_gateways", ()))
 
         # Process Load Balancers
-        self._process_load_balancers(network_data.get("load_balancers", []))
+        self._process_load_balancers(network_data.get("load_balancers", ()))
 
         # Process VNet Gateways
-        self._process_vnet_gateways(network_data.get("virtual_network_gateways", []))
+        self._process_vnet_gateways(network_data.get("virtual_network_gateways", ()))
 
         # Process Bastion Hosts
-        self._process_bastion_hosts(network_data.get("bastion_hosts", []))
+        self._process_bastion_hosts(network_data.get("bastion_hosts", ()))
 
         # Process NICs to find VMs
-        self._process_nics(network_data.get("nics", []))
+        self._process_nics(network_data.get("nics", ()))
 
         # Process Private DNS Zones
-        self._process_dns_zones(network_data.get("private_dns_zones", []))
+        self._process_dns_zones(network_data.get("private_dns_zones", ()))
 
         return self.get_graph_data()
 
@@ -128,6 +219,7 @@ class NetworkGraphBuilder:
     def _add_edge(self, edge: NetworkEdge) -> None:
         """Add an edge to the graph."""
         self.edges.append(edge)
+        self._edges_by_type[edge.edge_type].append(edge)
 
     def _process_vnets(self, vnets: list[dict]) -> None:
         """Process Virtual Networks."""
@@ -138,27 +230,26 @@ class NetworkGraphBuilder:
                 type="vnet",
                 resource_group=vnet.get("resourceGroup", ""),
                 properties={
-                    "addressSpace": vnet.get("addressSpace", {}).get("addressPrefixes", []),
+                    "addressSpace": (vnet.get("addressSpace") or _EMPTY).get("addressPrefixes", []),
                     "location": vnet.get("location", ""),
-                    "dnsServers": vnet.get("dhcpOptions", {}).get("dnsServers", []) if vnet.get("dhcpOptions") else [],
+                    "dnsServers": (vnet.get("dhcpOptions") or _EMPTY).get("dnsServers", []),
                     "enableDdosProtection": vnet.get("enableDdosProtection", False),
-                    "subnets": [s.get("name") for s in vnet.get("subnets", [])],
+                    "subnets": [s.get("name") for s in vnet.get("subnets", ())],
                 }
             )
             self._add_node(node)
+            self._vnet_name_index.setdefault(node.name, node.id)
 
     def _process_subnets(self, subnets: list[dict]) -> None:
         """Process Subnets."""
         for subnet in subnets:
             vnet_name = subnet.get("vnet", "")
             subnet_id = subnet.get("id", "")
+            nsg_id = subnet.get("nsg_id")
+            route_table_id = subnet.get("routeTable_id")
 
             # Find parent VNet
-            parent_vnet_id = None
-            for node_id, node in self.nodes.items():
-                if node.type == "vnet" and node.name == vnet_name:
-                    parent_vnet_id = node_id
-                    break
+            parent_vnet_id = self._vnet_name_index.get(vnet_name)
 
             node = NetworkNode(
                 id=subnet_id,
@@ -170,12 +261,12 @@ class NetworkGraphBuilder:
                     "addressPrefix": subnet.get("addressPrefix", ""),
                     "addressPrefixes": subnet.get("addressPrefixes", []),
                     "vnet": vnet_name,
-                    "nsg": extract_name_from_id(subnet.get("nsg_id")),
-                    "routeTable": extract_name_from_id(subnet.get("routeTable_id")),
-                    "serviceEndpoints": [se.get("service") for se in subnet.get("serviceEndpoints", [])],
-                    "delegations": [d.get("serviceName") for d in subnet.get("delegations", [])],
-                    "ipConfigCount": len(subnet.get("ipConfigurations", [])),
-                    "privateEndpointCount": len(subnet.get("privateEndpoints", [])),
+                    "nsg": extract_name_from_id(nsg_id),
+                    "routeTable": extract_name_from_id(route_table_id),
+                    "serviceEndpoints": [se.get("service") for se in subnet.get("serviceEndpoints", ())],
+                    "delegations": [d.get("serviceName") for d in subnet.get("delegations", ())],
+                    "ipConfigCount": len(subnet.get("ipConfigurations", ())),
+                    "privateEndpointCount": len(subnet.get("privateEndpoints", ())),
                 }
             )
             self._add_node(node)
@@ -189,18 +280,18 @@ class NetworkGraphBuilder:
                 ))
 
             # Add edge to NSG if exists
-            if subnet.get("nsg_id"):
+            if nsg_id:
                 self._add_edge(NetworkEdge(
                     source_id=subnet_id,
-                    target_id=subnet.get("nsg_id"),
+                    target_id=nsg_id,
                     edge_type="secured_by"
                 ))
 
             # Add edge to Route Table if exists
-            if subnet.get("routeTable_id"):
+            if route_table_id:
                 self._add_edge(NetworkEdge(
                     source_id=subnet_id,
-                    target_id=subnet.get("routeTable_id"),
+                    target_id=route_table_id,
                     edge_type="routes_via"
                 ))
 
@@ -214,32 +305,34 @@ class NetworkGraphBuilder:
                 resource_group=nsg.get("resourceGroup", ""),
                 properties={
                     "location": nsg.get("location", ""),
-                    "customRuleCount": len(nsg.get("customRules", [])),
-                    "associatedSubnets": [extract_name_from_id(s.get("id")) for s in nsg.get("subnets", [])],
-                    "associatedNics": [extract_name_from_id(n.get("id")) for n in nsg.get("networkInterfaces", [])],
+                    "customRuleCount": len(nsg.get("customRules", ())),
+                    "associatedSubnets": [extract_name_from_id(s.get("id")) for s in nsg.get("subnets", ())],
+                    "associatedNics": [extract_name_from_id(n.get("id")) for n in nsg.get("networkInterfaces", ())],
                 }
             )
             self._add_node(node)
 
             # Process security rules
-            for rule in nsg.get("securityRules", []) + nsg.get("customRules", []):
+            # customRules mirrors securityRules when collected, so use only one
+            rule_source = f"NSG: {nsg.get('name')}"
+            for rule in nsg.get("customRules") or nsg.get("securityRules", ()):
                 access_rule = AccessRule(
                     source=self._format_address(
                         rule.get("sourceAddressPrefix"),
-                        rule.get("sourceAddressPrefixes", [])
+                        rule.get("sourceAddressPrefixes", ())
                     ),
                     destination=self._format_address(
                         rule.get("destinationAddressPrefix"),
-                        rule.get("destinationAddressPrefixes", [])
+                        rule.get("destinationAddressPrefixes", ())
                     ),
                     port=self._format_ports(
                         rule.get("destinationPortRange"),
-                        rule.get("destinationPortRanges", [])
+                        rule.get("destinationPortRanges", ())
                     ),
                     protocol=rule.get("protocol", "*"),
                     action=rule.get("access", ""),
                     priority=rule.get("priority", 0),
-                    rule_source=f"NSG: {nsg.get('name')}",
+                    rule_source=rule_source,
                     direction=rule.get("direction", "")
                 )
                 self.access_rules.append(access_rule)
@@ -247,6 +340,7 @@ class NetworkGraphBuilder:
     def _process_firewalls(self, firewalls: list[dict]) -> None:
         """Process Azure Firewalls."""
         for fw in firewalls:
+            ip_configs = fw.get("ipConfigurations_processed", [])
             node = NetworkNode(
                 id=fw.get("id", ""),
                 name=fw.get("name", ""),
@@ -254,21 +348,23 @@ class NetworkGraphBuilder:
                 resource_group=fw.get("resourceGroup", ""),
                 properties={
                     "location": fw.get("location", ""),
-                    "sku": fw.get("sku", {}).get("tier", ""),
+                    "sku": (fw.get("sku") or _EMPTY).get("tier", ""),
                     "threatIntelMode": fw.get("threatIntelMode", ""),
-                    "firewallPolicy": extract_name_from_id(fw.get("firewallPolicy", {}).get("id")) if fw.get("firewallPolicy") else None,
-                    "ipConfigurations": fw.get("ipConfigurations_processed", []),
-                    "privateIp": next((ip.get("privateIpAddress") for ip in fw.get("ipConfigurations_processed", []) if ip.get("privateIpAddress")), None),
+                    "firewallPolicy": _ref_name(fw, "firewallPolicy"),
+                    "ipConfigurations": ip_configs,
+                    "privateIp": next((ip.get("privateIpAddress") for ip in ip_configs if ip.get("privateIpAddress")), None),
                 }
             )
             self._add_node(node)
 
             # Add edges to subnets
-            for ip_config in fw.get("ipConfigurations_processed", []):
-                if ip_config.get("subnet"):
+            fw_id = fw.get("id")
+            for ip_config in ip_configs:
+                subnet_id = ip_config.get("subnet")
+                if subnet_id:
                     self._add_edge(NetworkEdge(
-                        source_id=ip_config.get("subnet"),
-                        target_id=fw.get("id"),
+                        source_id=subnet_id,
+                        target_id=fw_id,
                         edge_type="contains"
                     ))
 
@@ -282,54 +378,59 @@ class NetworkGraphBuilder:
                 resource_group=policy.get("resourceGroup", ""),
                 properties={
                     "location": policy.get("location", ""),
-                    "sku": policy.get("sku", {}).get("tier", ""),
+                    "sku": (policy.get("sku") or _EMPTY).get("tier", ""),
                     "threatIntelMode": policy.get("threatIntelMode", ""),
-                    "ruleCollectionGroupCount": len(policy.get("ruleCollectionGroups_detail", [])),
+                    "ruleCollectionGroupCount": len(policy.get("ruleCollectionGroups_detail", ())),
                 }
             )
             self._add_node(node)
 
             # Process rule collections
-            for rcg in policy.get("ruleCollectionGroups_detail", []):
-                for rc in rcg.get("ruleCollections", []):
-                    for rule in rc.get("rules", []):
+            for rcg in policy.get("ruleCollectionGroups_detail", ()):
+                for rc in rcg.get("ruleCollections", ()):
+                    # Shared by every rule in the collection
+                    rc_action = rc.get("action", "")
+                    rc_priority = rc.get("priority", 0)
+                    rc_source = f"FW Policy: {policy.get('name')} / {rcg.get('name')} / {rc.get('name')}"
+
+                    for rule in rc.get("rules", ()):
                         rule_type = rule.get("ruleType", "")
 
                         if rule_type == "NetworkRule":
                             access_rule = AccessRule(
-                                source=", ".join(rule.get("sourceAddresses", []) + rule.get("sourceIpGroups", [])),
-                                destination=", ".join(rule.get("destinationAddresses", []) + rule.get("destinationFqdns", [])),
-                                port=", ".join(rule.get("destinationPorts", [])),
-                                protocol=", ".join(rule.get("ipProtocols", [])),
-                                action=rc.get("action", ""),
-                                priority=rc.get("priority", 0),
-                                rule_source=f"FW Policy: {policy.get('name')} / {rcg.get('name')} / {rc.get('name')}",
+                                source=", ".join(chain(rule.get("sourceAddresses", ()), rule.get("sourceIpGroups", ()))),
+                                destination=", ".join(chain(rule.get("destinationAddresses", ()), rule.get("destinationFqdns", ()))),
+                                port=", ".join(rule.get("destinationPorts", ())),
+                                protocol=", ".join(rule.get("ipProtocols", ())),
+                                action=rc_action,
+                                priority=rc_priority,
+                                rule_source=rc_source,
                                 direction="Outbound"
                             )
                             self.access_rules.append(access_rule)
 
                         elif rule_type == "ApplicationRule":
                             access_rule = AccessRule(
-                                source=", ".join(rule.get("sourceAddresses", []) + rule.get("sourceIpGroups", [])),
-                                destination=", ".join(rule.get("targetFqdns", []) + rule.get("targetUrls", [])),
-                                port=", ".join([f"{p.get('port')}/{p.get('protocolType')}" for p in rule.get("protocols", [])]) if rule.get("protocols") else "*",
+                                source=", ".join(chain(rule.get("sourceAddresses", ()), rule.get("sourceIpGroups", ()))),
+                                destination=", ".join(chain(rule.get("targetFqdns", ()), rule.get("targetUrls", ()))),
+                                port=", ".join([f"{p.get('port')}/{p.get('protocolType')}" for p in rule.get("protocols", ())]) if rule.get("protocols") else "*",
                                 protocol="HTTP/HTTPS",
-                                action=rc.get("action", ""),
-                                priority=rc.get("priority", 0),
-                                rule_source=f"FW Policy: {policy.get('name')} / {rcg.get('name')} / {rc.get('name')}",
+                                action=rc_action,
+                                priority=rc_priority,
+                                rule_source=rc_source,
                                 direction="Outbound"
                             )
                             self.access_rules.append(access_rule)
 
                         elif rule_type == "NatRule":
                             access_rule = AccessRule(
-                                source=", ".join(rule.get("sourceAddresses", []) + rule.get("sourceIpGroups", [])),
+                                source=", ".join(chain(rule.get("sourceAddresses", ()), rule.get("sourceIpGroups", ()))),
                                 destination=f"{rule.get('translatedAddress')}:{rule.get('translatedPort')}",
-                                port=", ".join(rule.get("destinationPorts", [])),
-                                protocol=", ".join(rule.get("ipProtocols", [])),
+                                port=", ".join(rule.get("destinationPorts", ())),
+                                protocol=", ".join(rule.get("ipProtocols", ())),
                                 action="DNAT",
-                                priority=rc.get("priority", 0),
-                                rule_source=f"FW Policy: {policy.get('name')} / {rcg.get('name')} / {rc.get('name')}",
+                                priority=rc_priority,
+                                rule_source=rc_source,
                                 direction="Inbound"
                             )
                             self.access_rules.append(access_rule)
@@ -346,7 +447,9 @@ class NetworkGraphBuilder:
                     "location": rt.get("location", ""),
                     "routes": rt.get("routes_processed", []),
                     "disableBgpRoutePropagation": rt.get("disableBgpRoutePropagation", False),
-                    "associatedSubnets": [extract_name_from_id(s.get("id")) for s in rt.get("subnets", [])],
+                    "associatedSubnets": [extract_name_from_id(s.get("id")) for s in rt.get("subnets", ())],
+                    # Names repeat across VNets ("default"); IDs identify the subnet
+                    "associatedSubnetIds": [s.get("id") for s in rt.get("subnets", ())],
                 }
             )
             self._add_node(node)
@@ -361,7 +464,7 @@ class NetworkGraphBuilder:
                 resource_group=ep.get("resourceGroup", ""),
                 properties={
                     "location": ep.get("location", ""),
-                    "subnet": extract_name_from_id(ep.get("subnet", {}).get("id")) if ep.get("subnet") else None,
+                    "subnet": _ref_name(ep, "subnet"),
                     "connections": ep.get("connections", []),
                     "customDnsConfigs": ep.get("customDnsConfigs", []),
                 }
@@ -369,9 +472,10 @@ class NetworkGraphBuilder:
             self._add_node(node)
 
             # Add edge to subnet
-            if ep.get("subnet", {}).get("id"):
+            subnet_id = _ref_id(ep, "subnet")
+            if subnet_id:
                 self._add_edge(NetworkEdge(
-                    source_id=ep.get("subnet", {}).get("id"),
+                    source_id=subnet_id,
                     target_id=ep.get("id"),
                     edge_type="contains"
                 ))
@@ -380,21 +484,19 @@ class NetworkGraphBuilder:
         """Process VNet Peerings."""
         for peering in peerings:
             # Find source VNet
-            source_vnet_id = None
-            for node_id, node in self.nodes.items():
-                if node.type == "vnet" and node.name == peering.get("sourceVnet"):
-                    source_vnet_id = node_id
-                    break
+            source_vnet_id = self._vnet_name_index.get(peering.get("sourceVnet"))
+            remote_vnet_id = peering.get("remoteVnetId")
 
-            if source_vnet_id and peering.get("remoteVnetId"):
+            if source_vnet_id and remote_vnet_id:
+                state = peering.get("peeringState")
                 self._add_edge(NetworkEdge(
                     source_id=source_vnet_id,
-                    target_id=peering.get("remoteVnetId"),
+                    target_id=remote_vnet_id,
                     edge_type="peering",
-                    bidirectional=peering.get("peeringState") == "Connected",
+                    bidirectional=state == "Connected",
                     properties={
                         "name": peering.get("name"),
-                        "state": peering.get("peeringState"),
+                        "state": state,
                         "allowVnetAccess": peering.get("allowVirtualNetworkAccess"),
                         "allowForwardedTraffic": peering.get("allowForwardedTraffic"),
                         "allowGatewayTransit": peering.get("allowGatewayTransit"),
@@ -412,9 +514,9 @@ class NetworkGraphBuilder:
                 resource_group=pip.get("resourceGroup", ""),
                 properties={
                     "ipAddress": pip.get("ipAddress", ""),
-                    "sku": pip.get("sku", {}).get("name", ""),
+                    "sku": (pip.get("sku") or _EMPTY).get("name", ""),
                     "allocationMethod": pip.get("publicIPAllocationMethod", ""),
-                    "associatedTo": extract_name_from_id(pip.get("ipConfiguration", {}).get("id")) if pip.get("ipConfiguration") else None,
+                    "associatedTo": _ref_name(pip, "ipConfiguration"),
                 }
             )
             self._add_node(node)
@@ -430,8 +532,8 @@ class NetworkGraphBuilder:
                 properties={
                     "location": gw.get("location", ""),
                     "sku": gw.get("sku", {}),
-                    "backendPools": [p.get("name") for p in gw.get("backendAddressPools", [])],
-                    "listeners": [l.get("name") for l in gw.get("httpListeners", [])],
+                    "backendPools": [p.get("name") for p in gw.get("backendAddressPools", ())],
+                    "listeners": [l.get("name") for l in gw.get("httpListeners", ())],
                 }
             )
             self._add_node(node)
@@ -446,10 +548,10 @@ class NetworkGraphBuilder:
                 resource_group=lb.get("resourceGroup", ""),
                 properties={
                     "location": lb.get("location", ""),
-                    "sku": lb.get("sku", {}).get("name", ""),
-                    "frontendIpConfigurations": [f.get("name") for f in lb.get("frontendIpConfigurations", [])],
-                    "backendPools": [b.get("name") for b in lb.get("backendAddressPools", [])],
-                    "rules": [r.get("name") for r in lb.get("loadBalancingRules", [])],
+                    "sku": (lb.get("sku") or _EMPTY).get("name", ""),
+                    "frontendIpConfigurations": [f.get("name") for f in lb.get("frontendIpConfigurations", ())],
+                    "backendPools": [b.get("name") for b in lb.get("backendAddressPools", ())],
+                    "rules": [r.get("name") for r in lb.get("loadBalancingRules", ())],
                 }
             )
             self._add_node(node)
@@ -466,7 +568,7 @@ class NetworkGraphBuilder:
                     "location": gw.get("location", ""),
                     "gatewayType": gw.get("gatewayType", ""),
                     "vpnType": gw.get("vpnType", ""),
-                    "sku": gw.get("sku", {}).get("name", ""),
+                    "sku": (gw.get("sku") or _EMPTY).get("name", ""),
                     "activeActive": gw.get("activeActive", False),
                 }
             )
@@ -482,7 +584,7 @@ class NetworkGraphBuilder:
                 resource_group=bastion.get("resourceGroup", ""),
                 properties={
                     "location": bastion.get("location", ""),
-                    "sku": bastion.get("sku", {}).get("name", ""),
+                    "sku": (bastion.get("sku") or _EMPTY).get("name", ""),
                     "scaleUnits": bastion.get("scaleUnits", 2),
                 }
             )
@@ -492,7 +594,7 @@ class NetworkGraphBuilder:
         """Process Network Interfaces to identify VMs."""
         for nic in nics:
             # Check if attached to a VM
-            vm_id = nic.get("virtualMachine", {}).get("id") if nic.get("virtualMachine") else None
+            vm_id = _ref_id(nic, "virtualMachine")
 
             if vm_id:
                 vm_name = extract_name_from_id(vm_id)
@@ -511,14 +613,15 @@ class NetworkGraphBuilder:
                     self._add_node(node)
 
                 # Add NIC info to VM
-                for ip_config in nic.get("ipConfigurations", []):
+                vm_props = self.nodes[vm_id].properties
+                for ip_config in nic.get("ipConfigurations", ()):
                     private_ip = ip_config.get("privateIPAddress")
-                    subnet_id = ip_config.get("subnet", {}).get("id") if ip_config.get("subnet") else None
+                    subnet_id = _ref_id(ip_config, "subnet")
 
                     if private_ip:
-                        self.nodes[vm_id].properties["privateIps"].append(private_ip)
+                        vm_props["privateIps"].append(private_ip)
                     if subnet_id:
-                        self.nodes[vm_id].properties["subnets"].append(extract_name_from_id(subnet_id))
+                        vm_props["subnets"].append(extract_name_from_id(subnet_id))
 
                         # Add edge to subnet
                         self._add_edge(NetworkEdge(
@@ -530,6 +633,7 @@ class NetworkGraphBuilder:
     def _process_dns_zones(self, zones: list[dict]) -> None:
         """Process Private DNS Zones."""
         for zone in zones:
+            links = zone.get("virtualNetworkLinks", ())
             node = NetworkNode(
                 id=zone.get("id", ""),
                 name=zone.get("name", ""),
@@ -537,19 +641,18 @@ class NetworkGraphBuilder:
                 resource_group=zone.get("resourceGroup", ""),
                 properties={
                     "recordCount": zone.get("numberOfRecordSets", 0),
-                    "linkedVnets": [extract_name_from_id(l.get("virtualNetwork", {}).get("id"))
-                                   for l in zone.get("virtualNetworkLinks", [])
-                                   if l.get("virtualNetwork")],
+                    "linkedVnets": [_ref_name(l, "virtualNetwork") for l in links if l.get("virtualNetwork")],
                 }
             )
             self._add_node(node)
 
             # Add edges to linked VNets
-            for link in zone.get("virtualNetworkLinks", []):
-                vnet_id = link.get("virtualNetwork", {}).get("id") if link.get("virtualNetwork") else None
+            zone_id = zone.get("id")
+            for link in links:
+                vnet_id = _ref_id(link, "virtualNetwork")
                 if vnet_id:
                     self._add_edge(NetworkEdge(
-                        source_id=zone.get("id"),
+                        source_id=zone_id,
                         target_id=vnet_id,
                         edge_type="dns_linked"
                     ))
@@ -574,42 +677,60 @@ class NetworkGraphBuilder:
             "potential_issues": [],
         }
 
-        # Get all subnets
-        subnets = {nid: node for nid, node in self.nodes.items() if node.type == "subnet"}
+        # Index subnets by VNet and route tables by associated subnet once,
+        # rather than rescanning every node per subnet and per peering.
+        # Resource IDs are case-insensitive and a route table's subnet
+        # references often spell the resource group differently.
+        subnets = {}
+        subnets_by_vnet: dict[str, list[NetworkNode]] = {}
+        route_tables_by_subnet: dict[str, list[NetworkNode]] = {}
+        for nid, node in self.nodes.items():
+            if node.type == "subnet":
+                subnets[nid] = node
+                subnets_by_vnet.setdefault(node.properties.get("vnet"), []).append(node)
+            elif node.type == "route_table":
+                for associated_id in dict.fromkeys(
+                    (sid or "").lower() for sid in node.properties.get("associatedSubnetIds", ())
+                ):
+                    route_tables_by_subnet.setdefault(associated_id, []).append(node)
 
         # Build connectivity between subnets
+        matrix_subnets = self.connectivity_matrix["subnets"]
         for subnet_id, subnet in subnets.items():
-            self.connectivity_matrix["subnets"][subnet.name] = {
+            matrix_subnets[subnet.name] = {
                 "vnet": subnet.properties.get("vnet"),
                 "addressPrefix": subnet.properties.get("addressPrefix"),
                 "can_reach": [],
                 "reachable_from": [],
                 "nsg": subnet.properties.get("nsg"),
-                "has_internet_access": self._check_internet_access(subnet),
+                "has_internet_access": self._check_internet_access(
+                    route_tables_by_subnet.get(subnet_id.lower(), ())
+                ),
             }
 
         # Analyze peerings for inter-vnet connectivity
-        for edge in self.edges:
-            if edge.edge_type == "peering":
-                source_vnet = extract_name_from_id(edge.source_id)
-                target_vnet = extract_name_from_id(edge.target_id)
-
-                # Find subnets in each VNet
-                source_subnets = [s for s in subnets.values() if s.properties.get("vnet") == source_vnet]
-                target_subnets = [s for s in subnets.values() if s.properties.get("vnet") == target_vnet]
-
-                for src in source_subnets:
-                    for tgt in target_subnets:
-                        if edge.properties.get("allowVnetAccess"):
-                            self.connectivity_matrix["subnets"][src.name]["can_reach"].append({
-                                "subnet": tgt.name,
-                                "via": "VNet Peering",
-                                "vnet": target_vnet,
-                            })
-
-        # Analyze rules for access patterns
-        for rule in self.access_rules:
-            self.connectivity_matrix["rules_summary"].append({
+        for edge in self._edges_by_type.get("peering", ()):
+            if not edge.properties.get("allowVnetAccess"):
+                continue
+
+            source_vnet = extract_name_from_id(edge.source_id)
+            target_vnet = extract_name_from_id(edge.target_id)
+
+            # Every subnet of the source VNet can reach the same target
+            # subnets, so build those entries once per peering and share them
+            reachable = [
+                {"subnet": tgt.name, "via": "VNet Peering", "vnet": target_vnet}
+                for tgt in subnets_by_vnet.get(target_vnet, ())
+            ]
+            if not reachable:
+                continue
+            for src in subnets_by_vnet.get(source_vnet, ()):
+                matrix_subnets[src.name]["can_reach"].extend(reachable)
+
+        # Analyze rules for access patterns. The summary stays plain dicts
+        # since the HTML visualizer embeds it with the stdlib json module.
+        self.connectivity_matrix["rules_summary"] = [
+            {
                 "source": rule.source,
                 "destination": rule.destination,
                 "port": rule.port,
@@ -617,7 +738,9 @@ class NetworkGraphBuilder:
                 "action": rule.action,
                 "direction": rule.direction,
                 "rule_source": rule.rule_source,
-            })
+            }
+            for rule in self.access_rules
+        ]
 
         # Identify potential issues
         self._identify_issues()
@@ -648,9 +771,10 @@ class NetworkGraphBuilder:
                     })
 
                 # Check for risky ports open to internet
-                if rule.source in INTERNET_SOURCES:
+                if is_internet_source(rule.source):
+                    exposed = parse_port_mask(rule.port) & RISKY_PORT_MASK
                     for port, description in RISKY_PORTS.items():
-                        if port in rule.port or rule.port == "*":
+                        if exposed >> int(port) & 1:
                             issues.append({
                                 "severity": "High",
                                 "issue": f"Risky port {port} ({description}) exposed to internet",
@@ -670,17 +794,14 @@ class NetworkGraphBuilder:
 
         self.connectivity_matrix["potential_issues"] = issues
 
-    def _check_internet_access(self, subnet: NetworkNode) -> bool:
-        """Check if subnet has internet access based on route tables and NSGs."""
-        # Check for 0.0.0.0/0 route
-        for node in self.nodes.values():
-            if node.type == "route_table" and subnet.name in node.properties.get("associatedSubnets", []):
-                for route in node.properties.get("routes", []):
-                    if route.get("addressPrefix") == "0.0.0.0/0":
-                        if route.get("nextHopType") == "Internet":
-                            return True
-                        elif route.get("nextHopType") in ["VirtualAppliance", "VirtualNetworkGateway"]:
-                            return True  # Via NVA/Gateway
+    def _check_internet_access(self, route_tables: list[NetworkNode]) -> bool:
+        """Check if a subnet has internet access based on its associated route tables."""
+        # A 0.0.0.0/0 route with next hop "None" drops internet-bound traffic;
+        # any other default route (Internet, NVA, gateway) still reaches out
+        for node in route_tables:
+            for route in node.properties.get("routes", ()):
+                if route.get("addressPrefix") == "0.0.0.0/0":
+                    return route.get("nextHopType") != "None"
 
         # If no explicit route, Azure provides default internet access
         return True
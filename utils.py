@@ -2,9 +2,49 @@
 Shared utilities for Azure Network Documenter.
 """
 
+import dataclasses
+import json
 import logging
 import sys
-from typing import Optional
+from datetime import date
+from functools import lru_cache
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional dependency - fall back to the standard library
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency - binary sidecars are skipped
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency - binary sidecars are uncompressed
+    zstandard = None
+
+ZSTD_LEVEL = 3
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """
+    Stream handler that leaves buffering of progress output to the stream.
+
+    The stock StreamHandler flushes after every record. Here only warnings
+    and errors are flushed immediately; everything else goes out when the
+    stream's buffer fills, on flush_logs(), or at interpreter exit.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.WARNING:
+                self.flush()
+        except Exception:
+            self.handleError(record)
 
 
 def setup_logging(level: int = logging.INFO) -> logging.Logger:
@@ -12,7 +52,7 @@ def setup_logging(level: int = logging.INFO) -> logging.Logger:
     logger = logging.getLogger("azure_network_documenter")
 
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
+        handler = BufferedStreamHandler(sys.stdout)
         formatter = logging.Formatter(
             "%(asctime)s - %(levelname)s - %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S"
@@ -24,6 +64,35 @@ def setup_logging(level: int = logging.INFO) -> logging.Logger:
     return logger
 
 
+def dump_msgpack(obj: Any) -> bytes:
+    """
+    Serialize an object to MessagePack (requires the msgpack package).
+
+    The result is zstd-compressed when the zstandard package is installed.
+    """
+    data = msgpack.packb(obj, use_bin_type=True, default=_json_default)
+    if zstandard is not None:
+        data = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def load_msgpack(data: bytes) -> Any:
+    """Parse a MessagePack document, zstd-compressed or not (requires msgpack)."""
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("the zstandard package is required to read compressed .msgpack files")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return msgpack.unpackb(data, raw=False)
+
+
+def flush_logs() -> None:
+    """Flush buffered log output, e.g. at the end of a processing phase."""
+    for handler in logger.handlers:
+        handler.flush()
+
+
+# The same subnet, NSG and NIC IDs are resolved many times per run
+@lru_cache(maxsize=4096)
 def extract_name_from_id(resource_id: Optional[str]) -> str:
     """
     Extract resource name from Azure resource ID.
@@ -39,8 +108,51 @@ def extract_name_from_id(resource_id: Optional[str]) -> str:
     """
     if not resource_id:
         return ""
-    parts = resource_id.split("/")
-    return parts[-1] if parts else ""
+    return resource_id.rpartition("/")[2]
+
+
+def load_json(data: bytes | str) -> Any:
+    """
+    Parse a JSON document.
+
+    Uses orjson when it is installed and the standard library otherwise.
+    Both raise a subclass of json.JSONDecodeError on invalid input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode types the standard json module doesn't support natively."""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    return str(obj)
+
+
+def dump_json(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON.
+
+    Datetimes are written in ISO 8601 format and dataclasses as objects
+    (natively by orjson, via _json_default otherwise); any other unknown
+    type is converted with str().
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        The encoded JSON document
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode("utf-8")
 
 
 # Create default logger instance